@@ -6,7 +6,8 @@
 var fileuploadModule = angular.module('djng.fileupload', ['ngFileUpload']);
 
 
-fileuploadModule.directive('djngFileuploadUrl', ['Upload', function(Upload) {
+fileuploadModule.directive('djngFileuploadUrl', ['$http', '$httpParamSerializer', '$q', '$timeout', 'Upload',
+                                                 function($http, $httpParamSerializer, $q, $timeout, Upload) {
 	return {
 		restrict: 'A',
 		require: 'ngModel',
@@ -22,24 +23,90 @@ fileuploadModule.directive('djngFileuploadUrl', ['Upload', function(Upload) {
 				element.addClass('djng-empty');
 			}
 
+			// poll for the preview of an image, which is generated after the upload has finished
+			function fetchPreview(element, previewUrl) {
+				$http.get(previewUrl).then(function(response) {
+					if (element.data('preview_url') !== previewUrl)
+						return;  // meanwhile another file has been uploaded
+					if (response.status === 202) {
+						$timeout(function() {
+							fetchPreview(element, previewUrl);
+						}, 500);
+					} else {
+						element.css('background-image', response.data.url);
+					}
+				}, function(response) {
+					console.error(response.statusText);
+				});
+			}
+
+			// send the file's content in chunks, starting at offset, and retry after connection failures
+			function uploadChunks(file, uploadId, offset, chunkSize, retries) {
+				var url = attrs.djngFileuploadUrl;
+				if (offset >= file.size)
+					return Upload.upload({data: {action: 'finalize', upload_id: uploadId}, url: url});
+				return $http.put(url + '?' + $httpParamSerializer({upload_id: uploadId, offset: offset}),
+				                 file.slice(offset, offset + chunkSize), {
+					headers: {'Content-Type': 'application/octet-stream'},
+					transformRequest: angular.identity
+				}).then(function(response) {
+					return uploadChunks(file, uploadId, response.data.offset, chunkSize, 0);
+				}, function(response) {
+					if (response.status === 409)
+						return uploadChunks(file, uploadId, response.data.offset, chunkSize, retries);
+					if (retries < 5 && (response.status <= 0 || response.status >= 500)) {
+						return $timeout(function() {
+							return uploadChunks(file, uploadId, offset, chunkSize, retries + 1);
+						}, 1000 << retries);
+					}
+					return $q.reject(response);
+				});
+			}
+
+			function uploadChunked(file, filetype, chunkSize) {
+				var data = {
+					action: 'init',
+					filetype: filetype,
+					file_name: file.name,
+					file_size: file.size,
+					content_type: file.type || 'application/octet-stream'
+				};
+				return Upload.upload({data: data, url: attrs.djngFileuploadUrl}).then(function(response) {
+					return uploadChunks(file, response.data.upload_id, response.data.offset, chunkSize, 0);
+				}).then(function(response) {
+					return {data: {'file:0': response.data}};
+				});
+			}
+
 			scope.uploadFile = function(file, filetype, id, model) {
-				var data = {'file:0': file, filetype: filetype},
-				    element = angular.element(document.querySelector('#' + id));
+				var element = angular.element(document.querySelector('#' + id)), promise;
 				element.addClass('uploading');
-				Upload.upload({
-					data: data,
-					url: attrs.djngFileuploadUrl
-				}).then(function(response) {
+				if (attrs.djngChunkSize) {
+					promise = uploadChunked(file, filetype, parseInt(attrs.djngChunkSize));
+				} else {
+					promise = Upload.upload({
+						data: {'file:0': file, filetype: filetype},
+						url: attrs.djngFileuploadUrl
+					});
+				}
+				promise.then(function(response) {
 					var field = response.data['file:0'];
 					var cf = element.data('current_file');
 					element.removeClass('uploading');
 					if (!field)
 						return;
-					element.css('background-image', field.url);
+					element.data('preview_url', field.preview_url);
+					if (field.preview_url) {
+						element.css('background-image', 'none');
+						fetchPreview(element, field.preview_url);
+					} else {
+						element.css('background-image', field.url);
+					}
 					element.removeClass('djng-empty');
 					element.removeClass('djng-preset');
 					element.val(field.file_name);
 					delete field.url;  // we don't want to send back the whole image
+					delete field.preview_url;
 					angular.extend(scope.$eval(model), field, cf ? {current_file: cf} : {});
 				}, function(respose) {
 					element.removeClass('uploading');
@@ -59,6 +126,7 @@ fileuploadModule.directive('djngFileuploadButton', function() {
 				var model = scope.$eval(_model),
 				    element = angular.element(document.querySelector('#' + id));
 				element.css('background-image', 'none');
+				element.removeData('preview_url');
 				element.addClass('djng-empty');
 				element.removeClass('djng-preset');
 				element.val(element.data('area_label'));
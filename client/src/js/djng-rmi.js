@@ -12,14 +12,21 @@ var djng_rmi_module = angular.module('djng.rmi', []);
 // djangoRMI.name.method(data).success(...).error(...)
 // @param data (optional): If set and @allowed_action was auto, then the call is performed as method
 //     POST. If data is unset, method GET is used. data must be a valid JavaScript object or undefined.
+// If a batch URL is set, calls made during the same turn of the event loop are coalesced into one
+// single request to that URL, served by djng.views.batch.RMIBatchView. Then the returned promise
+// does not offer the deprecated methods success() and error().
 djng_rmi_module.provider('djangoRMI', function() {
-	var remote_methods, http;
+	var remote_methods, http, batch_url = null, batch_invoke;
 
 	this.configure = function(conf) {
 		remote_methods = conf;
 		convert_configuration(remote_methods);
 	};
 
+	this.setBatchUrl = function(url) {
+		batch_url = url;
+	};
+
 	function convert_configuration(obj) {
 		angular.forEach(obj, function(val, key) {
 			if (!angular.isObject(val))
@@ -42,7 +49,7 @@ djng_rmi_module.provider('djangoRMI', function() {
 							config.data = data;
 						}
 					}
-					return http(config);
+					return batch_url ? batch_invoke(config) : http(config);
 				};
 			} else {
 				// continue to examine the values recursively
@@ -51,8 +58,50 @@ djng_rmi_module.provider('djangoRMI', function() {
 		});
 	}
 
-	this.$get = ['$http', function($http) {
+	this.$get = ['$http', '$q', '$timeout', function($http, $q, $timeout) {
+		var queue = [];
+
 		http = $http;
+		batch_invoke = function(config) {
+			var deferred = $q.defer();
+			if (queue.length === 0) {
+				$timeout(flush_queue, 0, false);
+			}
+			queue.push({config: config, deferred: deferred});
+			return deferred.promise;
+		};
+
+		function flush_queue() {
+			var pending = queue, invocations;
+			queue = [];
+			if (pending.length === 1) {
+				pending[0].deferred.resolve(http(pending[0].config));
+				return;
+			}
+			invocations = pending.map(function(item) {
+				var invocation = {url: item.config.url, method: item.config.headers['DjNg-Remote-Method']};
+				if (item.config.method === 'POST') {
+					invocation.data = item.config.data;
+				}
+				return invocation;
+			});
+			http.post(batch_url, invocations, {headers: {'X-Requested-With': 'XMLHttpRequest'}}).then(function(response) {
+				angular.forEach(pending, function(item, index) {
+					var result = response.data[index];
+					var item_response = {data: result.data, status: result.status, headers: response.headers, config: item.config};
+					if (result.status >= 200 && result.status < 300) {
+						item.deferred.resolve(item_response);
+					} else {
+						item.deferred.reject(item_response);
+					}
+				});
+			}, function(response) {
+				angular.forEach(pending, function(item) {
+					item.deferred.reject(response);
+				});
+			});
+		}
+
 		return remote_methods;
 	}];
 });
@@ -12,19 +12,27 @@
     var djngUrls = angular.module('djng.urls', []);
 
     djngUrls.provider('djangoUrl', function djangoUrlProvider() {
-            var reverseUrl = '/angular/reverse/';
+            var reverseUrl = '/angular/reverse/', urlPatterns = {};
 
             this.setReverseUrl = function (url) {
                 reverseUrl = url;
             };
 
+            /*
+             Configure the URL patterns as rendered by the templatetag {% djng_url_patterns %}.
+             URLs with a known name then are reversed on the client, rather than by the middleware.
+             */
+            this.setUrlPatterns = function (patterns) {
+                urlPatterns = patterns;
+            };
+
             this.$get = function () {
-                return new djangoUrl(reverseUrl);
+                return new djangoUrl(reverseUrl, urlPatterns);
             };
         }
     );
 
-    var djangoUrl = function (reverseUrl) {
+    var djangoUrl = function (reverseUrl, urlPatterns) {
         /*
          Url-reversing service
          */
@@ -73,9 +81,83 @@
             return url + ((url.indexOf('?') === -1) ? '?' : '&') + parts.join('&');
         }
 
+        /*
+         Quote a value in the same way as Django does, keeping the sub-delimiters and the characters
+         '/~:@' of RFC 3986. Values starting with ':' are kept as placeholders for $resource.
+         */
+        function quoteValue(value) {
+            value = String(value);
+            if (value.lastIndexOf(':', 0) === 0)
+                return value;
+            return encodeURIComponent(value).replace(/%(24|26|2B|2C|3B|3D|2F|3A|40)/gi, decodeURIComponent);
+        }
+
+        /*
+         Reverse the URL using the configured URL patterns, in the same way as Django does.
+         Returns undefined if no pattern matches, so that the caller can fall back to the middleware.
+         Empty arguments are ignored, as they are by the middleware.
+         */
+        function reverseLocally(url_name, args_or_kwargs) {
+            var candidates = urlPatterns[url_name], args = [], kwargs = {}, i, j;
+            if (!candidates)
+                return;
+            if (Array.isArray(args_or_kwargs)) {
+                args = args_or_kwargs.filter(function (value) {
+                    return value !== '' && value !== null && value !== undefined;
+                });
+            } else {
+                angular.forEach(args_or_kwargs, function (value, key) {
+                    if (value !== '' && value !== null && value !== undefined) {
+                        kwargs[key] = value;
+                    }
+                });
+            }
+            for (i = 0; i < candidates.length; i++) {
+                var path = candidates[i][0], params = candidates[i][1], subs = {}, match = true;
+                if (args.length) {
+                    if (args.length !== params.length)
+                        continue;
+                    for (j = 0; j < params.length; j++) {
+                        subs[params[j]] = args[j];
+                    }
+                } else {
+                    if (Object.keys(kwargs).length !== params.length)
+                        continue;
+                    for (j = 0; j < params.length; j++) {
+                        if (!kwargs.hasOwnProperty(params[j])) {
+                            match = false;
+                            break;
+                        }
+                        subs[params[j]] = kwargs[params[j]];
+                    }
+                    if (!match)
+                        continue;
+                }
+                if (candidates[i][2] && !hasPlaceholder(subs) && !new RegExp(candidates[i][2]).test(substitute(path, subs, String)))
+                    continue;
+                return substitute(path, subs, quoteValue);
+            }
+        }
+
+        function hasPlaceholder(subs) {
+            return Object.keys(subs).some(function (key) {
+                return String(subs[key]).lastIndexOf(':', 0) === 0;
+            });
+        }
+
+        function substitute(path, subs, quote) {
+            return path.replace(/%\((\w+)\)s|%%/g, function (placeholder, name) {
+                return name ? quote(subs[name]) : '%';
+            });
+        }
+
         // Service public interface
         this.reverse = function (url_name, args_or_kwargs) {
-            var url = buildUrl(reverseUrl, {djng_url_name: url_name});
+            var url = reverseLocally(url_name, args_or_kwargs);
+            if (url !== undefined)
+                return url;
+
+            url = buildUrl(reverseUrl, {djng_url_name: url_name});
             /*
              Django wants arrays in query params encoded the following way: a = [1,2,3] -> ?a=1&a=2$a=3
              buildUrl function doesn't natively understand lists in params, so in case of a argument array
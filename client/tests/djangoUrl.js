@@ -78,3 +78,38 @@ describe('unit tests for module djng.url', function () {
 
     });
 });
+
+describe('unit tests for module djng.url with configured url patterns', function () {
+    beforeEach(function () {
+        module('djng.urls', function (djangoUrlProvider) {
+            djangoUrlProvider.setUrlPatterns({
+                'home': [['/', []]],
+                'shop:product': [['/shop/%(slug)s/', ['slug']]],
+                'article': [
+                    ['/articles/%(year)s/%(slug)s/', ['year', 'slug'], '^/articles/(?<year>\\d{4})/(?<slug>[\\w-]+)/$'],
+                    ['/articles/%(pk)s/', ['pk'], '^/articles/(?<pk>\\d+)/$']
+                ]
+            });
+        });
+    });
+
+    it('should reverse urls without arguments locally', inject(function (djangoUrl) {
+        expect(djangoUrl.reverse('home')).toBe('/');
+    }));
+    it('should reverse urls with arguments locally', inject(function (djangoUrl) {
+        expect(djangoUrl.reverse('article', [7])).toBe('/articles/7/');
+        expect(djangoUrl.reverse('article', {pk: 7})).toBe('/articles/7/');
+        expect(djangoUrl.reverse('article', {year: 2020, slug: 'hello'})).toBe('/articles/2020/hello/');
+        expect(djangoUrl.reverse('shop:product', {slug: 'a b@c'})).toBe('/shop/a%20b@c/');
+    }));
+    it('should keep parametrized values for $resource', inject(function (djangoUrl) {
+        expect(djangoUrl.reverse('article', {pk: ':id'})).toBe('/articles/:id/');
+    }));
+    it('should ignore empty arguments', inject(function (djangoUrl) {
+        expect(djangoUrl.reverse('home', {id: ''})).toBe('/');
+    }));
+    it('should fall back to the middleware for unknown names or unmatched arguments', inject(function (djangoUrl) {
+        expect(djangoUrl.reverse('unknown')).toBe('/angular/reverse/?djng_url_name=unknown');
+        expect(djangoUrl.reverse('article', {pk: 'abc'})).toBe('/angular/reverse/?djng_url_name=article&djng_url_kwarg_pk=abc');
+    }));
+});
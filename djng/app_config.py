@@ -13,3 +13,10 @@ class DjangoAngularConfig(AppConfig):
             return id_
 
         RadioSelect.id_for_label = id_for_label
+
+        from djng import app_settings
+
+        if app_settings.PRECOMPUTE_RMI:
+            from djng.core.urlresolvers import get_all_remote_methods
+
+            get_all_remote_methods()
@@ -24,6 +24,73 @@ class AppSettings(object):
             raise ImproperlyConfigured("'DJNG_THUMBNAIL_SIZE' must be a 2-tuple of integers.")
         return {'crop': True, 'size': size}
 
+    @property
+    def JSON_BACKEND(self):
+        """
+        Dotted path to the class used to encode JSON responses.
+        """
+        return self._setting('DJNG_JSON_BACKEND', 'djng.core.encoders.StandardJSONBackend')
+
+    @property
+    def PRECOMPUTE_RMI(self):
+        """
+        If true, compute the configuration of all remote methods while starting the application,
+        rather than while rendering the first page using ``{% djng_all_rmi %}``.
+        """
+        return self._setting('DJNG_PRECOMPUTE_RMI', False)
+
+    @property
+    def RMI_SCRIPT_NAME(self):
+        """
+        Path of the static file written by ``manage.py djng_compile_rmi``.
+        """
+        return self._setting('DJNG_RMI_SCRIPT_NAME', 'djng/rmi-config.js')
+
+    @property
+    def REVERSE_CACHE_SIZE(self):
+        """
+        Maximum number of URLs memoized by ``AngularUrlMiddleware``. Set to 0 to disable caching.
+        """
+        return self._setting('DJNG_REVERSE_CACHE_SIZE', 1024)
+
+    @property
+    def JSON_COMPRESS_LEVEL(self):
+        """
+        Compression level used for JSON responses of views setting ``compress_min_length``. This
+        is passed to gzip as level, 1 to 9, and to Brotli as quality, 0 to 11.
+        """
+        return self._setting('DJNG_JSON_COMPRESS_LEVEL', 6)
+
+    @property
+    def PREVIEW_WORKERS(self):
+        """
+        Number of threads used by ``FileUploadView`` to generate the previews of uploaded images.
+        If 0, previews are generated while processing the upload.
+        """
+        return self._setting('DJNG_PREVIEW_WORKERS', 0)
+
+    @property
+    def MAX_UPLOAD_SIZE(self):
+        """
+        Maximum size in bytes of files uploaded through ``ChunkedFileUploadView``, or None if unlimited.
+        """
+        return self._setting('DJNG_MAX_UPLOAD_SIZE', None)
+
+    @property
+    def UPLOAD_TEMP_MAX_AGE(self):
+        """
+        Number of seconds a file is kept in the temporary upload storage, before it expires.
+        """
+        return self._setting('DJNG_UPLOAD_TEMP_MAX_AGE', 86400)
+
+    @property
+    def UPLOAD_REAP_INTERVAL(self):
+        """
+        If set, ``FileUploadView`` deletes expired files from the temporary upload storage in a
+        background thread, at most once per this number of seconds.
+        """
+        return self._setting('DJNG_UPLOAD_REAP_INTERVAL', None)
+
 
 import sys
 app_settings = AppSettings()
@@ -0,0 +1,80 @@
+import zlib
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def get_content_encodings():
+    """
+    Return the content codings supported for compressing responses, in the order of preference.
+    Brotli is only available, if the ``brotli`` library is installed.
+    """
+    return ('br', 'gzip') if brotli else ('gzip',)
+
+
+def get_accepted_encoding(accept_encoding):
+    """
+    Return the preferred content coding, which is accepted according to the given value of the
+    HTTP header ``Accept-Encoding``, or None if the content shall be sent uncompressed.
+    """
+    accepted, refused = set(), set()
+    for item in accept_encoding.split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) <= 0:
+                    refused.add(coding)
+                    continue
+            except ValueError:
+                continue
+        accepted.add(coding)
+    for encoding in get_content_encodings():
+        # the wildcard does not apply to codings refused explicitly
+        if encoding in accepted or '*' in accepted and encoding not in refused:
+            return encoding
+
+
+class _GzipCompressor(object):
+    def __init__(self, level):
+        # a window size of 16 + MAX_WBITS adds the gzip header and trailer
+        self.compressobj = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def process(self, data):
+        return self.compressobj.compress(data)
+
+    def flush(self):
+        return self.compressobj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressobj.flush(zlib.Z_FINISH)
+
+
+def _get_compressor(encoding, level):
+    if encoding == 'br':
+        return brotli.Compressor(quality=min(max(level, 0), 11))
+    return _GzipCompressor(min(max(level, 1), 9))
+
+
+def compress_string(content, encoding, level):
+    """
+    Compress the given bytes using the content coding ``'gzip'`` or ``'br'``.
+    """
+    compressor = _get_compressor(encoding, level)
+    return compressor.process(content) + compressor.finish()
+
+
+def compress_sequence(sequence, encoding, level):
+    """
+    Compress an iterable of bytes chunk by chunk. Each chunk is flushed, so that the client can
+    decode it as soon as it has been received.
+    """
+    compressor = _get_compressor(encoding, level)
+    for chunk in sequence:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
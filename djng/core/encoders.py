@@ -0,0 +1,69 @@
+import json
+from functools import lru_cache
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+
+class StandardJSONBackend(object):
+    """
+    Encode data to JSON using the ``json`` module from the Python standard library.
+    """
+    def __init__(self, encoder=DjangoJSONEncoder):
+        self.encoder = encoder
+
+    def dumps(self, data, **kwargs):
+        return json.dumps(data, cls=self.encoder, **kwargs)
+
+
+class OrjsonBackend(StandardJSONBackend):
+    """
+    Encode data to JSON using the much faster ``orjson`` library. Types unknown to orjson, as well
+    as dates and times, are converted by the ``default()`` method of the given encoder, so that
+    the output remains the same as with ``DjangoJSONEncoder``. Data orjson refuses to encode, such
+    as integers exceeding 64 bits, is encoded by the standard library instead.
+    """
+    def __init__(self, encoder=DjangoJSONEncoder):
+        import orjson
+
+        super(OrjsonBackend, self).__init__(encoder)
+        self.orjson = orjson
+        self.default = encoder().default
+
+    def dumps(self, data, indent=None, sort_keys=False, **kwargs):
+        option = self.orjson.OPT_PASSTHROUGH_DATETIME | self.orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= self.orjson.OPT_INDENT_2
+        if sort_keys:
+            option |= self.orjson.OPT_SORT_KEYS
+        try:
+            return self.orjson.dumps(data, default=self.default, option=option)
+        except self.orjson.JSONEncodeError:
+            return super(OrjsonBackend, self).dumps(data, indent=indent, sort_keys=sort_keys, **kwargs)
+
+
+@lru_cache(maxsize=None)
+def get_json_backend(backend=None, encoder=DjangoJSONEncoder):
+    """
+    Return an instance of the JSON backend, given as class or as dotted path. If ``None``, the
+    backend configured by the setting ``DJNG_JSON_BACKEND`` is used. If the backend's library is
+    not installed, fall back to the Python standard library.
+    """
+    from djng import app_settings
+
+    if backend is None:
+        backend = app_settings.JSON_BACKEND
+    if isinstance(backend, str):
+        backend = import_string(backend)
+    try:
+        return backend(encoder)
+    except ImportError:
+        return StandardJSONBackend(encoder)
+
+
+@receiver(setting_changed)
+def reset_json_backend(setting, **kwargs):
+    if setting == 'DJNG_JSON_BACKEND':
+        get_json_backend.cache_clear()
@@ -0,0 +1,96 @@
+import calendar
+import os
+import threading
+import time
+import uuid
+
+from django.core import signing
+from django.core.cache import cache
+
+from djng import app_settings
+
+BUCKET_FORMAT = '%Y%m%d%H'
+
+# signs the names of files in the temporary upload storage, including the time of signing
+temp_name_signer = signing.TimestampSigner(salt='djng.upload_temp')
+
+
+def get_upload_name(file_name, now=None):
+    """
+    Returns the name for a file in the temporary upload storage. Files are sharded into one folder
+    per hour, which itself is split into 256 subfolders, so that no folder grows without bounds
+    and expired files can be found without inspecting newer ones.
+    """
+    bucket = time.strftime(BUCKET_FORMAT, time.gmtime(now))
+    return '{0}/{1}/{2}'.format(bucket, uuid.uuid4().hex[:2], file_name)
+
+
+def _delete_expired(storage, name, cutoff):
+    try:
+        if storage.get_modified_time(name).timestamp() >= cutoff:
+            return 0
+        storage.delete(name)
+    except OSError:
+        return 0
+    return 1
+
+
+def _remove_empty_folder(storage, name):
+    try:
+        os.rmdir(storage.path(name))
+    except (NotImplementedError, OSError):
+        pass
+
+
+def reap_expired_uploads(storage=None, max_age=None, now=None):
+    """
+    Delete all files from the temporary upload storage, which have not been modified during the
+    last ``max_age`` seconds, defaulting to the setting ``DJNG_UPLOAD_TEMP_MAX_AGE``. Folders of
+    hours younger than that, are skipped altogether. Returns the number of deleted files.
+    """
+    if storage is None:
+        storage = app_settings.upload_storage
+    if max_age is None:
+        max_age = app_settings.UPLOAD_TEMP_MAX_AGE
+    cutoff = (time.time() if now is None else now) - max_age
+    try:
+        buckets, files = storage.listdir('')
+    except OSError:
+        return 0
+    count = 0
+    for name in files:
+        # uploaded before files were sharded
+        count += _delete_expired(storage, name, cutoff)
+    for bucket in buckets:
+        try:
+            started = calendar.timegm(time.strptime(bucket, BUCKET_FORMAT))
+        except ValueError:
+            continue
+        if started >= cutoff:
+            continue
+        # folders may vanish meanwhile, if another process reaps the same storage
+        try:
+            shards = storage.listdir(bucket)[0]
+        except OSError:
+            continue
+        for shard in shards:
+            folder = '{0}/{1}'.format(bucket, shard)
+            try:
+                names = storage.listdir(folder)[1]
+            except OSError:
+                continue
+            for name in names:
+                count += _delete_expired(storage, '{0}/{1}'.format(folder, name), cutoff)
+            _remove_empty_folder(storage, folder)
+        _remove_empty_folder(storage, bucket)
+    return count
+
+
+def schedule_reaping():
+    """
+    Reap expired uploads in a background thread, at most once per ``DJNG_UPLOAD_REAP_INTERVAL``
+    seconds. Does nothing, if that setting is not configured.
+    """
+    interval = app_settings.UPLOAD_REAP_INTERVAL
+    if interval and cache.add('djng.upload.reaped', True, interval):
+        threading.Thread(target=reap_expired_uploads, daemon=True).start()
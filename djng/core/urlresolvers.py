@@ -1,38 +1,63 @@
+import posixpath
+import re
 from inspect import isclass
+from weakref import WeakKeyDictionary
 
-from django.urls import (get_resolver, get_urlconf, resolve, reverse, NoReverseMatch)
+from django.conf import settings
+from django.conf.urls.i18n import is_language_prefix_patterns_used
+from django.urls import (get_ns_resolver, get_resolver, get_script_prefix, get_urlconf, resolve, reverse,
+                         NoReverseMatch)
 from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import get_language
 
 try:
     from django.utils.module_loading import import_string
 except ImportError:
     from django.utils.module_loading import import_by_path as import_string
 
+from djng import app_settings
 from djng.views.mixins import JSONResponseMixin
 
 
 def _get_remote_methods_for(view_object, url):
     # view_object can be a view class or instance
     result = {}
-    for field in dir(view_object):
-        member = getattr(view_object, field, None)
-        if callable(member) and hasattr(member, 'allow_rmi'):
-            config = {
-                'url': url,
-                'method': getattr(member, 'allow_rmi'),
-                'headers': {'DjNg-Remote-Method': field},
-            }
-            result.update({field: config})
+    for field, (member, method) in view_object.get_remote_methods().items():
+        config = {
+            'url': url,
+            'method': method,
+            'headers': {'DjNg-Remote-Method': field},
+        }
+        result.update({field: config})
     return result
 
 
+# computed remote methods and URL patterns per resolver, script prefix and language. Since Django
+# creates a new resolver object whenever the urlconf changes, outdated entries are discarded
+# automatically.
+_remote_methods_cache = WeakKeyDictionary()
+_url_patterns_cache = WeakKeyDictionary()
+
+
 def get_all_remote_methods(resolver=None, ns_prefix=''):
     """
     Returns a dictionary to be used for calling ``djangoCall.configure()``, which itself extends the
     Angular API to the client, offering him to call remote methods.
+    Unless invoked with a resolver, the result is cached per urlconf and language and must not be
+    modified.
     """
-    if not resolver:
-        resolver = get_resolver(get_urlconf())
+    if resolver:
+        return _get_all_remote_methods(resolver, ns_prefix)
+    resolver = get_resolver(get_urlconf())
+    cache = _remote_methods_cache.setdefault(resolver, {})
+    # URLs created by i18n_patterns() depend on the active language
+    key = get_script_prefix(), get_language(), ns_prefix
+    if key not in cache:
+        cache[key] = _get_all_remote_methods(resolver, ns_prefix)
+    return cache[key]
+
+
+def _get_all_remote_methods(resolver, ns_prefix):
     result = {}
     for name in resolver.reverse_dict.keys():
         if not isinstance(name, str):
@@ -46,12 +71,92 @@ def get_all_remote_methods(resolver=None, ns_prefix=''):
         except (NoReverseMatch, ImproperlyConfigured):
             pass
     for namespace, ns_pattern in resolver.namespace_dict.items():
-        sub_res = get_all_remote_methods(ns_pattern[1], ns_prefix + namespace + ':')
+        sub_res = _get_all_remote_methods(ns_pattern[1], ns_prefix + namespace + ':')
         if sub_res:
             result[namespace] = sub_res
     return result
 
 
+def get_url_patterns():
+    """
+    Returns a dictionary to be used for calling ``djangoUrlProvider.setUrlPatterns()``, which
+    allows the client to reverse URLs without a round trip through ``AngularUrlMiddleware``.
+    For each URL name, including its namespaces, it contains a list of candidates, each consisting
+    of the URL path with placeholders such as ``%(pk)s``, and the names of those placeholders. Names
+    with more than one candidate additionally contain the regular expression of each candidate,
+    so that the client can choose the matching one.
+    The result is cached per urlconf and language and must not be modified.
+    """
+    resolver = get_resolver(get_urlconf())
+    cache = _url_patterns_cache.setdefault(resolver, {})
+    script_prefix = get_script_prefix()
+    key = script_prefix, get_language()
+    if key not in cache:
+        cache[key] = _get_url_patterns(resolver, script_prefix.replace('%', '%%'))
+    return cache[key]
+
+
+def _get_url_patterns(resolver, prefix, ns_prefix='', ns_pattern='', ns_converters=None):
+    result = {}
+    if ns_pattern:
+        resolver = get_ns_resolver(ns_pattern, resolver, tuple(ns_converters.items()))
+    for name in resolver.reverse_dict.keys():
+        if not isinstance(name, str):
+            continue
+        candidates = [[prefix + path, params, pattern]
+                      for possibility, pattern, defaults, converters in resolver.reverse_dict.getlist(name)
+                      for path, params in possibility]
+        if len(candidates) == 1:
+            del candidates[0][2]
+        else:
+            for candidate in candidates:
+                candidate[2] = _js_regex(re.escape(prefix.replace('%%', '%')) + candidate[2])
+        result[ns_prefix + name] = candidates
+
+    for namespace, (extra, sub_resolver) in resolver.namespace_dict.items():
+        converters = dict(ns_converters or {}, **sub_resolver.pattern.converters)
+        result.update(_get_url_patterns(sub_resolver, prefix, ns_prefix + namespace + ':',
+                                        ns_pattern + extra, converters))
+
+    # reversing by application namespace refers to its default instance namespace
+    for app_name, instance_names in resolver.app_dict.items():
+        if app_name in resolver.namespace_dict:
+            continue
+        instance_prefix = ns_prefix + instance_names[0] + ':'
+        for name, candidates in list(result.items()):
+            if name.startswith(instance_prefix):
+                result[ns_prefix + app_name + ':' + name[len(instance_prefix):]] = candidates
+    return result
+
+
+def _js_regex(pattern):
+    """
+    Convert the syntax of a Python regular expression into its JavaScript counterpart.
+    """
+    pattern = pattern.replace('(?P<', '(?<').replace(r'\Z', '$').replace(r'\A', '^')
+    return re.sub(r'\(\?P=(\w+)\)', r'\\k<\1>', '^' + pattern)
+
+
 def get_current_remote_methods(view):
     if isinstance(view, JSONResponseMixin):
         return _get_remote_methods_for(view, view.request.path_info)
+
+
+def is_language_prefixed():
+    """
+    Returns True if the URLs of the current urlconf are prefixed by the language, using
+    ``i18n_patterns()``.
+    """
+    return is_language_prefix_patterns_used(get_urlconf() or settings.ROOT_URLCONF)[0]
+
+
+def get_rmi_script_name(language=None):
+    """
+    Returns the path of the static file written by ``manage.py djng_compile_rmi``. If the URLs are
+    prefixed by the language using ``i18n_patterns()``, there is one such file per language.
+    """
+    name = app_settings.RMI_SCRIPT_NAME
+    if language and is_language_prefixed():
+        root, ext = posixpath.splitext(name)
+        name = '{0}.{1}{2}'.format(root, language, ext)
+    return name
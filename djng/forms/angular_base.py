@@ -1,14 +1,17 @@
 from base64 import b64encode
 from collections import UserList
 import json
+import uuid
 import warnings
 
+from django.core.cache import cache
 from django.forms import forms
 from django.forms.boundfield import BoundField
 from django.http import QueryDict
 from django.utils.html import format_html, format_html_join, escape, conditional_escape
 from django.utils.encoding import force_text
 from django.utils.module_loading import import_string
+from django.utils.translation import get_language
 from django.utils.safestring import mark_safe, SafeText, SafeData
 from django.core.exceptions import ValidationError, ImproperlyConfigured
 
@@ -149,15 +152,33 @@ class NgWidgetMixin(object):
         return context
 
 
+# widget classes mixed with NgWidgetMixin, keyed by the original widget class
+_ng_widget_classes = {}
+
+
+def get_ng_widget_class(widget_class):
+    """
+    Returns a subclass of the given widget class, mixed with ``NgWidgetMixin``. This class is
+    created only once per widget class, rather than for each rendered widget.
+    """
+    try:
+        return _ng_widget_classes[widget_class]
+    except KeyError:
+        ng_widget_class = type(widget_class.__name__, (NgWidgetMixin, widget_class), {})
+        return _ng_widget_classes.setdefault(widget_class, ng_widget_class)
+
+
 class NgBoundField(BoundField):
     @property
     def errors(self):
         """
         Returns a TupleErrorList for this field. This overloaded method adds additional error lists
-        to the errors as detected by the form validator.
+        to the errors as detected by the form validator. They are computed once per validation.
         """
-        if not hasattr(self, '_errors_cache'):
+        form_errors = self.form.errors
+        if getattr(self, '_errors_cache_key', None) is not form_errors:
             self._errors_cache = self.form.get_field_errors(self)
+            self._errors_cache_key = form_errors
         return self._errors_cache
 
     def css_classes(self, extra_classes=None):
@@ -199,7 +220,7 @@ class NgBoundField(BoundField):
         widget._field = self.field
         # Make sure that NgWidgetMixin is not already part of the widget's bases so it doesn't get added twice.
         if not isinstance(widget, NgWidgetMixin):
-            widget.__class__ = type(widget.__class__.__name__, (NgWidgetMixin, widget.__class__), {})
+            widget.__class__ = get_ng_widget_class(widget.__class__)
         return super(NgBoundField, self).as_widget(widget, attrs, only_initial)
 
     def build_widget_attrs(self, attrs, widget=None):
@@ -274,11 +295,34 @@ class BaseFieldsModifierMetaclass(type):
                 raise ImproperlyConfigured(msg.format(name, field.__class__.__name__, new_class))
 
 
+def _get_choices_schema(choices):
+    for value, label in choices:
+        if isinstance(label, (list, tuple)):
+            yield {'label': force_text(value), 'choices': list(_get_choices_schema(label))}
+        else:
+            # model choice fields wrap their values into a ModelChoiceIteratorValue
+            yield {'value': getattr(value, 'value', value), 'label': force_text(label)}
+
+
+# rendered HTML of unbound forms, keyed by the result of NgFormBaseMixin.get_render_cache_key(). Each
+# entry also holds the generations of the form's classes, which are shared across processes through
+# Django's cache, so that NgFormBaseMixin.clear_render_cache() invalidates the HTML in all of them.
+_render_cache = {}
+
+
+def _get_render_generation_key(form_class):
+    return 'djng.render_cache.generation:{0}.{1}'.format(form_class.__module__, form_class.__qualname__)
+
+
 class NgFormBaseMixin(object):
     form_error_css_classes = 'djng-form-errors'
     field_error_css_classes = 'djng-field-errors'
+    use_render_cache = False
 
     def __init__(self, *args, **kwargs):
+        # forms with explicit initial data or model instance usually differ for each request
+        self._use_render_cache = (self.use_render_cache and not kwargs.get('initial')
+                                  and kwargs.get('instance') is None)
         try:
             form_name = self.form_name
         except AttributeError:
@@ -299,7 +343,10 @@ class NgFormBaseMixin(object):
             field = self.fields[name]
         except KeyError:
             raise KeyError('Key %r not found in Form' % name)
-        return NgBoundField(self, field, name)
+        try:
+            return self._bound_fields_cache[name]
+        except KeyError:
+            return self._bound_fields_cache.setdefault(name, NgBoundField(self, field, name))
 
     def add_prefix(self, field_name):
         """
@@ -318,20 +365,62 @@ class NgFormBaseMixin(object):
         return self.error_class([SafeTuple(
             (identifier, self.field_error_css_classes, '$pristine', '$pristine', 'invalid', e)) for e in errors])
 
-    def non_field_errors(self):
-        # See TupleErrorList.extend for an explanation
-        hidden_field_errors = []
-        for name, field in self.fields.items():
-            bf = self[name]
-            bf_errors = [conditional_escape(error) for error in bf.errors]
-            if bf.is_hidden and bf_errors:
+    def get_hidden_field_errors(self):
+        """
+        Return the errors of all hidden fields, to be rendered as non field errors.
+        They are computed once per validation.
+        """
+        form_errors = self.errors
+        if getattr(self, '_hidden_field_errors_cache_key', None) is not form_errors:
+            hidden_field_errors = []
+            for name in self.fields:
+                bf = self[name]
+                if not bf.is_hidden:
+                    continue
+                bf_errors = [conditional_escape(error) for error in bf.errors]
                 hidden_field_errors += [SafeTuple(
                     (self.form_name, self.form_error_css_classes, '$pristine', '{}.$isEmpty()'.format(name), 'invalid',
                         '(Hidden field {}) {}'.format(name, e[5])) ) for e in bf_errors]
+            self._hidden_field_errors_cache = hidden_field_errors
+            self._hidden_field_errors_cache_key = form_errors
+        return self._hidden_field_errors_cache
+
+    def non_field_errors(self):
+        # See TupleErrorList.extend for an explanation
+        hidden_field_errors = self.get_hidden_field_errors()
         errors = super(NgFormBaseMixin, self).non_field_errors()
         return self.error_class(hidden_field_errors + [SafeTuple(
             (self.form_name, self.form_error_css_classes, '$pristine', '$pristine', 'invalid', e)) for e in errors])
 
+    def get_form_schema(self):
+        """
+        Returns a dictionary describing this form and its fields. After encoding it as JSON, it can
+        be used by the client to render this form, instead of rendering it on the server.
+        """
+        return {
+            'form_name': self.form_name,
+            'fields': [self.get_field_schema(self[name]) for name in self.fields],
+        }
+
+    def get_field_schema(self, bound_field):
+        """
+        Returns a dictionary describing the given field and the attributes of its widget. Shall be
+        overridden by derived forms to add their extra attributes for AngularJS.
+        """
+        widget = bound_field.field.widget
+        schema = {
+            'name': bound_field.html_name,
+            'label': force_text(bound_field.label),
+            'help_text': force_text(bound_field.help_text),
+            'widget': widget.__class__.__name__,
+            'input_type': getattr(widget, 'input_type', None),
+            'is_hidden': bound_field.is_hidden,
+            'attrs': widget.build_attrs(widget.attrs, bound_field.build_widget_attrs({})),
+        }
+        if hasattr(bound_field.field, 'choices'):
+            schema['choices'] = list(_get_choices_schema(bound_field.field.choices))
+        return schema
+
     def update_widget_attrs(self, bound_field, attrs):
         """
         Updated the widget attributes which shall be added to the widget when rendering this field.
@@ -345,6 +434,63 @@ class NgFormBaseMixin(object):
                     attrs.update({'class': widget_classes})
         return attrs
 
+    def get_render_cache_key(self):
+        """
+        Returns the key used to cache the HTML of this form, or ``None`` if its HTML shall not be
+        cached. Only unbound forms with attribute ``use_render_cache`` set, without explicit initial
+        data and without an explicit or saved model instance are cached.
+        Override this method to add further values, on which the rendered HTML depends.
+        """
+        if not self._use_render_cache or self.is_bound:
+            return None
+        if getattr(getattr(self, 'instance', None), 'pk', None) is not None:
+            return None
+        return (self.__class__, self.form_name, getattr(self, 'scope_prefix', None), self.prefix, self.auto_id,
+                self.label_suffix, get_language(), type(self.renderer), tuple(self.fields),
+                tuple(sorted(getattr(self, 'ng_directives', {}).items())))
+
+    @classmethod
+    def clear_render_cache(cls):
+        """
+        Discard the cached HTML of this form class and its subclasses. This is required whenever
+        the rendered HTML changes, for instance after modifying the objects offered as choices.
+        Other processes discard their cached HTML, when rendering the form the next time.
+        """
+        cache.set(_get_render_generation_key(cls), uuid.uuid4().hex, None)
+        for key in list(_render_cache):
+            if issubclass(key[0], cls):
+                _render_cache.pop(key, None)
+
+    def get_render_generations(self):
+        """
+        Returns the generations of this form class and its base classes, as shared through Django's
+        cache. They change whenever ``clear_render_cache()`` is invoked on one of these classes.
+        """
+        keys = [_get_render_generation_key(klass) for klass in type(self).__mro__
+                if issubclass(klass, NgFormBaseMixin)]
+        generations = cache.get_many(keys)
+        for key in keys:
+            if key not in generations:
+                cache.add(key, uuid.uuid4().hex, None)
+                generations[key] = cache.get(key)
+        return tuple(generations[key] for key in keys)
+
+    def _html_output(self, *args, **kwargs):
+        cache_key = self.get_render_cache_key()
+        if cache_key is None:
+            return super(NgFormBaseMixin, self)._html_output(*args, **kwargs)
+        cache_key += (args, tuple(sorted(kwargs.items())))
+        generations = self.get_render_generations()
+        try:
+            cached_generations, html = _render_cache[cache_key]
+            if cached_generations == generations:
+                return html
+        except KeyError:
+            pass
+        html = super(NgFormBaseMixin, self)._html_output(*args, **kwargs)
+        _render_cache[cache_key] = generations, html
+        return html
+
     def rectify_multipart_form_data(self, data):
         """
         If a widget was converted and the Form data was submitted through a multipart request,
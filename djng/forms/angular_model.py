@@ -57,6 +57,11 @@ class NgModelFormMixin(NgFormBaseMixin):
                 data[name] = self.initial.get(name) if self.initial else field.initial
         return data
 
+    def get_form_schema(self):
+        schema = super(NgModelFormMixin, self).get_form_schema()
+        schema.update(scope_prefix=self.scope_prefix, initial=self.get_initial_data())
+        return schema
+
     def get_field_errors(self, field):
         errors = super(NgModelFormMixin, self).get_field_errors(field)
         if field.is_hidden:
@@ -1,6 +1,5 @@
 from django.forms import widgets
 from django.utils.html import format_html
-from django.utils.encoding import force_text
 from .angular_base import NgFormBaseMixin, SafeTuple
 
 
@@ -28,8 +27,8 @@ class NgFormValidationMixin(NgFormBaseMixin):
         if bound_field.is_hidden:
             return errors
         identifier = format_html('{0}[\'{1}\']', self.form_name, self.add_prefix(bound_field.name))
-        potential_errors = bound_field.field.get_potential_errors()
-        errors.extend([SafeTuple((identifier, self.field_error_css_classes, '$dirty', pe[0], 'invalid', force_text(pe[1])))
+        potential_errors = bound_field.field.get_cached_potential_errors()
+        errors.extend([SafeTuple((identifier, self.field_error_css_classes, '$dirty', pe[0], 'invalid', pe[1]))
                        for pe in potential_errors])
         if not isinstance(bound_field.field.widget, widgets.PasswordInput):
             # all valid fields shall display OK tick after changed into dirty state
@@ -39,6 +38,13 @@ class NgFormValidationMixin(NgFormBaseMixin):
                 errors.append(SafeTuple((identifier, self.field_error_css_classes, '$pristine', '$valid', 'valid', '')))
         return errors
 
+    def get_field_schema(self, bound_field):
+        # potential errors must be determined first, since they add attributes to the widget
+        potential_errors = [] if bound_field.is_hidden else bound_field.field.get_cached_potential_errors()
+        schema = super(NgFormValidationMixin, self).get_field_schema(bound_field)
+        schema['potential_errors'] = [{'key': key, 'message': message} for key, message in potential_errors]
+        return schema
+
     def update_widget_attrs(self, bound_field, attrs):
         super(NgFormValidationMixin, self).update_widget_attrs(bound_field, attrs)
         # transfer error state from bound field to AngularJS validation
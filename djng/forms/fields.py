@@ -1,28 +1,67 @@
+import os
 import re
-import mimetypes
+import weakref
 
 from django.conf import settings
-from django.contrib.staticfiles.storage import staticfiles_storage
 from django.core import signing
+from django.core.cache import cache
 from django.core.exceptions import ImproperlyConfigured, ValidationError
 from django.core.files.storage import default_storage
-from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
+from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile, UploadedFile
 from django.urls import reverse_lazy
 from django.forms import fields, models as model_fields, widgets
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.utils.translation import ugettext_lazy as _, ungettext_lazy
+from django.utils.encoding import force_text
+from django.utils.translation import get_language, ugettext_lazy as _, ungettext_lazy
 
 from djng import app_settings
-from .widgets import DropFileWidget, DropImageWidget
+from djng.core.uploads import get_upload_name, temp_name_signer
+from .widgets import DropFileWidget, DropImageWidget, get_file_icon_url, get_thumbnail_cache_key
 
 
 class DefaultFieldMixin(object):
     render_label = True
 
+    def __init__(self, *args, **kwargs):
+        super(DefaultFieldMixin, self).__init__(*args, **kwargs)
+        # Form fields are shallow copied for each form instance, hence this cache is shared by all
+        # forms instantiated from the same form class.
+        self._potential_errors_cache = {}
+
     def has_subwidgets(self):
         return False
 
+    def get_cached_potential_errors(self):
+        """
+        Returns the result of ``get_potential_errors()`` with its messages translated into the
+        active language, and adds the widget attributes required for client side validation.
+        This result is computed once per language and widget class, and reused unless the field
+        has been modified since, for instance in the ``__init__`` method of its form.
+        """
+        # error messages and validators are compared by identity; the cache entry keeps them alive,
+        # so that their ids can not be reused by other objects
+        error_messages, validators = list(self.error_messages.values()), list(self.validators)
+        signature = (self.required, [id(msg) for msg in error_messages],
+                     [id(validator) for validator in validators],
+                     [getattr(self, attr, None) for attr in ('min_length', 'max_length', 'min_value', 'max_value')])
+        cache_key = (get_language(), type(self.widget))
+        cached = self._potential_errors_cache.get(cache_key)
+        if cached and cached['signature'] == signature:
+            self.widget.attrs.update(cached['widget_attrs'])
+            return cached['potential_errors']
+
+        initial_attrs = dict(self.widget.attrs)
+        potential_errors = [(key, force_text(msg)) for key, msg in self.get_potential_errors()]
+        self._potential_errors_cache[cache_key] = {
+            'signature': signature,
+            'objects': (error_messages, validators),
+            'potential_errors': potential_errors,
+            'widget_attrs': {key: val for key, val in self.widget.attrs.items()
+                             if key not in initial_attrs or initial_attrs[key] != val},
+        }
+        return potential_errors
+
     def get_potential_errors(self):
         return self.get_input_required_errors()
 
@@ -370,6 +409,32 @@ class UUIDField(DefaultFieldMixin, fields.UUIDField):
         return errors
 
 
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class StoredTemporaryUploadedFile(TemporaryUploadedFile):
+    """
+    A file uploaded into the temporary storage, which is left in place instead of being copied.
+    Through its method ``temporary_file_path()``, ``FileSystemStorage`` moves it into its final
+    location, rather than copying its content. Storages which instead read its content, leave it
+    in place. Therefore, as with ``NamedTemporaryFile``, it is deleted from the temporary storage
+    when closed or garbage collected.
+    """
+    def __init__(self, file, name, content_type, size, charset, content_type_extra=None):
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+        self._remove_file = weakref.finalize(self, _remove_file, file.name)
+
+    def close(self):
+        try:
+            return self.file.close()
+        finally:
+            self._remove_file()
+
+
 class FileFieldMixin(DefaultFieldMixin):
     def to_python(self, value):
         # handle previously existing file
@@ -386,12 +451,24 @@ class FileFieldMixin(DefaultFieldMixin):
         try:
             obj = ''
             if ':' in value['temp_name']:
-                temp_name = self.signer.unsign(value['temp_name'])
-                temp_file = self.storage.open(temp_name, 'rb')
+                temp_name = self.temp_signer.unsign(value['temp_name'], max_age=app_settings.UPLOAD_TEMP_MAX_AGE)
                 file_size = self.storage.size(temp_name)
-                if file_size < settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+                temp_path = None
+                if file_size >= settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
+                    temp_path = self.get_local_path(temp_name)
+                if temp_path:
+                    # large files remain in the temporary storage until moved into their final location
+                    obj = StoredTemporaryUploadedFile(
+                        file=open(temp_path, 'rb'),
+                        name=value['file_name'],
+                        content_type=value['content_type'],
+                        size=file_size,
+                        charset=value['charset'],
+                        content_type_extra=value['content_type_extra'],
+                    )
+                elif file_size < settings.FILE_UPLOAD_MAX_MEMORY_SIZE:
                     obj = InMemoryUploadedFile(
-                        file=temp_file,
+                        file=self.storage.open(temp_name, 'rb'),
                         field_name=None,
                         name=value['file_name'],
                         charset=value['charset'],
@@ -399,6 +476,7 @@ class FileFieldMixin(DefaultFieldMixin):
                         content_type_extra=value['content_type_extra'],
                         size=file_size,
                     )
+                    self.storage.delete(temp_name)
                 else:
                     obj = TemporaryUploadedFile(
                         value['file_name'],
@@ -407,17 +485,20 @@ class FileFieldMixin(DefaultFieldMixin):
                         value['charset'],
                         content_type_extra=value['content_type_extra'],
                     )
-                    while True:
-                        chunk = temp_file.read(0x10000)
-                        if not chunk:
-                            break
-                        obj.file.write(chunk)
+                    with self.storage.open(temp_name, 'rb') as temp_file:
+                        while True:
+                            chunk = temp_file.read(0x10000)
+                            if not chunk:
+                                break
+                            obj.file.write(chunk)
                     obj.file.seek(0)
-                    obj.file.size = file_size
-                self.storage.delete(temp_name)
+                    obj.size = file_size
+                    self.storage.delete(temp_name)
                 self.remove_current(current_file)
             elif value['temp_name'] == 'delete':
                 self.remove_current(current_file)
+        except signing.SignatureExpired:
+            raise ValidationError("Uploaded file has expired")
         except signing.BadSignature:
             raise ValidationError("Got bogus upstream data")
         except (IOError, KeyError, TypeError):
@@ -430,46 +511,76 @@ class FileFieldMixin(DefaultFieldMixin):
         if filename:
             default_storage.delete(filename)
 
+    def get_local_path(self, temp_name):
+        """
+        Returns the path of a file in the temporary storage, or None if that storage is not local.
+        """
+        try:
+            return self.storage.path(temp_name)
+        except NotImplementedError:
+            return None
+
+    @classmethod
+    def save_upload(cls, file_obj):
+        """
+        Save an uploaded file into the temporary storage and return its name in there.
+        """
+        available_name = cls.storage.get_available_name(get_upload_name(file_obj.name))
+        return cls.storage.save(available_name, file_obj)
+
+    @classmethod
+    def get_upload_data(cls, temp_name, file_obj):
+        """
+        Returns the description of an uploaded file, which is sent back to the client.
+        """
+        return {
+            'temp_name': cls.temp_signer.sign(temp_name),
+            'file_name': file_obj.name,
+            'file_size': file_obj.size,
+            'charset': file_obj.charset,
+            'content_type': file_obj.content_type,
+            'content_type_extra': file_obj.content_type_extra,
+        }
+
 
 class FileField(FileFieldMixin, fields.FileField):
     storage = app_settings.upload_storage
     signer = signing.Signer()
+    temp_signer = temp_name_signer
 
     def __init__(self, *args, **kwargs):
         accept = kwargs.pop('accept', '*/*')
         fileupload_url = kwargs.pop('fileupload_url', reverse_lazy('fileupload'))
         area_label = kwargs.pop('area_label', _("Drop file here or click to upload"))
+        chunk_size = kwargs.pop('chunk_size', None)
         attrs = {
             'accept': accept,
             'ngf-pattern': accept,
         }
+        if chunk_size:
+            attrs['djng-chunk-size'] = chunk_size
         kwargs.update(widget=DropFileWidget(area_label, fileupload_url, attrs=attrs))
         super(FileField, self).__init__(*args, **kwargs)
 
     @classmethod
     def preview(cls, file_obj):
-        available_name = cls.storage.get_available_name(file_obj.name)
-        temp_name = cls.storage.save(available_name, file_obj)
-        extension = mimetypes.guess_extension(file_obj.content_type)
-        if extension:
-            extension = extension[1:]
-        else:
-            extension = '_blank'
-        icon_url = staticfiles_storage.url('djng/icons/{}.png'.format(extension))
-        return {
-            'url': 'url({})'.format(icon_url),
-            'temp_name': cls.signer.sign(temp_name),
-            'file_name': file_obj.name,
-            'file_size': file_obj.size,
-            'charset': file_obj.charset,
-            'content_type': file_obj.content_type,
-            'content_type_extra': file_obj.content_type_extra,
-        }
+        temp_name = cls.save_upload(file_obj)
+        data = cls.get_upload_data(temp_name, file_obj)
+        data['url'] = cls.get_preview_url(temp_name, file_obj.content_type)
+        return data
+
+    @classmethod
+    def get_preview_url(cls, temp_name, content_type=None):
+        """
+        Returns the icon representing the content type of an uploaded file as CSS url.
+        """
+        return 'url({})'.format(get_file_icon_url(content_type))
 
 
 class ImageField(FileFieldMixin, fields.ImageField):
     storage = app_settings.upload_storage
     signer = signing.Signer()
+    temp_signer = temp_name_signer
 
     def __init__(self, *args, **kwargs):
         if 'easy_thumbnails' not in settings.INSTALLED_APPS:
@@ -477,16 +588,21 @@ class ImageField(FileFieldMixin, fields.ImageField):
         accept = kwargs.pop('accept', 'image/*')
         fileupload_url = kwargs.pop('fileupload_url', reverse_lazy('fileupload'))
         area_label = kwargs.pop('area_label', _("Drop image here or click to upload"))
+        chunk_size = kwargs.pop('chunk_size', None)
         attrs = {
             'accept': accept,
             'ngf-pattern': accept,
         }
+        if chunk_size:
+            attrs['djng-chunk-size'] = chunk_size
         kwargs.update(widget=DropImageWidget(area_label, fileupload_url, attrs=attrs))
         super(ImageField, self).__init__(*args, **kwargs)
 
     def remove_current(self, image_name):
         from easy_thumbnails.models import Source, Thumbnail
 
+        if image_name:
+            cache.delete(get_thumbnail_cache_key(image_name))
         try:
             source = Source.objects.get(name=image_name)
             for thumb in Thumbnail.objects.filter(source=source):
@@ -499,19 +615,20 @@ class ImageField(FileFieldMixin, fields.ImageField):
 
     @classmethod
     def preview(cls, file_obj):
+        temp_name = cls.save_upload(file_obj)
+        data = cls.get_upload_data(temp_name, file_obj)
+        data['url'] = cls.get_preview_url(temp_name)
+        return data
+
+    @classmethod
+    def get_preview_url(cls, temp_name, content_type=None):
+        """
+        Generate a thumbnail of an image in the temporary storage and return it as CSS url,
+        containing the inlined thumbnail.
+        """
         from easy_thumbnails.files import get_thumbnailer
         from easy_thumbnails.templatetags.thumbnail import data_uri
 
-        available_name = cls.storage.get_available_name(file_obj.name)
-        temp_name = cls.storage.save(available_name, file_obj)
-        thumbnailer = get_thumbnailer(cls.storage.path(temp_name), relative_name=available_name)
+        thumbnailer = get_thumbnailer(cls.storage.path(temp_name), relative_name=temp_name)
         thumbnail = thumbnailer.generate_thumbnail(app_settings.THUMBNAIL_OPTIONS)
-        return {
-            'url': 'url({})'.format(data_uri(thumbnail)),
-            'temp_name': cls.signer.sign(temp_name),
-            'file_name': file_obj.name,
-            'file_size': file_obj.size,
-            'charset': file_obj.charset,
-            'content_type': file_obj.content_type,
-            'content_type_extra': file_obj.content_type_extra,
-        }
+        return 'url({})'.format(data_uri(thumbnail))
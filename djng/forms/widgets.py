@@ -1,7 +1,13 @@
+import json
 import mimetypes
+from functools import lru_cache
+from hashlib import md5
 
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.core import signing
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
 from django.forms import widgets
 from django.forms.utils import flatatt
 from django.utils.safestring import mark_safe
@@ -11,6 +17,83 @@ from django.utils.translation import ugettext_lazy as _
 from djng import app_settings
 
 
+@lru_cache(maxsize=None)
+def get_static_url(path):
+    """
+    Memoized lookup of a static file's URL, which may require to read the manifest of the
+    staticfiles storage.
+    """
+    return staticfiles_storage.url(path)
+
+
+def get_file_icon_url(content_type):
+    """
+    Returns the URL of the icon representing files of the given content type.
+    """
+    # the content type is sent by the client, hence only its extension, one of those known to
+    # mimetypes, is memoized
+    extension = content_type and mimetypes.guess_extension(content_type)
+    if extension:
+        extension = extension[1:]
+    else:
+        extension = '_blank'
+    return get_static_url('djng/icons/{}.png'.format(extension))
+
+
+@receiver(setting_changed)
+def reset_static_urls(setting, **kwargs):
+    if setting in ('STATIC_URL', 'STATICFILES_STORAGE'):
+        get_static_url.cache_clear()
+
+
+def get_thumbnail_cache_key(name):
+    options = json.dumps(app_settings.THUMBNAIL_OPTIONS, sort_keys=True)
+    return 'djng.thumbnail:' + md5('{0}:{1}'.format(name, options).encode('utf-8')).hexdigest()
+
+
+def get_thumbnail_urls(images):
+    """
+    Returns a dictionary mapping the names of the given image files onto the URLs of their
+    thumbnails, or onto an empty string, if an image can not be thumbnailed. These URLs are looked
+    up in the cache at once, and only those missing are resolved through easy_thumbnails.
+    """
+    from easy_thumbnails.exceptions import InvalidImageFormatError
+    from easy_thumbnails.files import get_thumbnailer
+
+    images = {image.name: image for image in images if image}
+    keys = {get_thumbnail_cache_key(name): name for name in images}
+    urls = {keys[key]: url for key, url in cache.get_many(list(keys)).items()}
+    missing = {}
+    for key, name in keys.items():
+        if name not in urls:
+            try:
+                thumbnailer = get_thumbnailer(images[name])
+                urls[name] = thumbnailer.get_thumbnail(app_settings.THUMBNAIL_OPTIONS).url
+            except InvalidImageFormatError:
+                urls[name] = ''
+            missing[key] = urls[name]
+    if missing:
+        cache.set_many(missing)
+    return urls
+
+
+def prefetch_thumbnail_urls(forms):
+    """
+    Resolve the thumbnails of all images rendered by a ``DropImageWidget`` in the given forms,
+    for instance those of a formset, using one single cache lookup. Call this before rendering
+    these forms.
+    """
+    widgets, images = [], []
+    for form in forms:
+        for name, field in form.fields.items():
+            if isinstance(field.widget, DropImageWidget):
+                widgets.append(field.widget)
+                images.append(form[name].value())
+    urls = get_thumbnail_urls(images)
+    for widget in widgets:
+        widget.thumbnail_urls = urls
+
+
 class DropFileWidget(widgets.Widget):
     signer = signing.Signer()
 
@@ -21,8 +104,6 @@ class DropFileWidget(widgets.Widget):
         self.filetype = 'file'
 
     def render(self, name, value, attrs=None, renderer=None):
-        from django.contrib.staticfiles.storage import staticfiles_storage
-
         extra_attrs = dict(attrs)
         extra_attrs.update({
             'name': name,
@@ -44,7 +125,7 @@ class DropFileWidget(widgets.Widget):
 
         # add a delete icon
         icon_attrs = {
-            'src': staticfiles_storage.url('djng/icons/{}/trash.svg'.format(self.filetype)),
+            'src': get_static_url('djng/icons/{}/trash.svg'.format(self.filetype)),
             'class': 'djng-btn-trash',
             'title': _("Delete File"),
             'djng-fileupload-button ': True,
@@ -62,19 +143,15 @@ class DropFileWidget(widgets.Widget):
                 'download': True,
                 'ng-cloak': True,
             }
-            download_icon = staticfiles_storage.url('djng/icons/{}/download.svg'.format(self.filetype))
+            download_icon = get_static_url('djng/icons/{}/download.svg'.format(self.filetype))
             elements.append(format_html('<a {}><img src="{}" /></a>', flatatt(download_attrs), download_icon))
 
         return format_html('<div class="drop-box">{}</div>', mark_safe(''.join(elements)))
 
     def update_attributes(self, attrs, value):
         if value:
-            try:
-                content_type, _ = mimetypes.guess_type(value.file.name)
-                extension = mimetypes.guess_extension(content_type)[1:]
-            except (IOError, IndexError, TypeError):
-                extension = '_blank'
-            background_url = staticfiles_storage.url('djng/icons/{}.png'.format(extension))
+            content_type, _ = mimetypes.guess_type(value.name)
+            background_url = get_file_icon_url(content_type)
             attrs.update({
                 'style': 'background-image: url({});'.format(background_url),
                 'current-file': self.signer.sign(value.name)
@@ -85,6 +162,7 @@ class DropImageWidget(DropFileWidget):
     def __init__(self, area_label, fileupload_url, attrs=None):
         super(DropImageWidget, self).__init__(area_label, fileupload_url, attrs=attrs)
         self.filetype = 'image'
+        self.thumbnail_urls = {}
 
     def update_attributes(self, attrs, value):
         if value:
@@ -96,12 +174,6 @@ class DropImageWidget(DropFileWidget):
                 })
 
     def get_background_url(self, value):
-        from easy_thumbnails.exceptions import InvalidImageFormatError
-        from easy_thumbnails.files import get_thumbnailer
-
-        try:
-            thumbnailer = get_thumbnailer(value)
-            thumbnail = thumbnailer.get_thumbnail(app_settings.THUMBNAIL_OPTIONS)
-            return thumbnail.url
-        except InvalidImageFormatError:
-            return
+        if value.name in self.thumbnail_urls:
+            return self.thumbnail_urls[value.name]
+        return get_thumbnail_urls([value]).get(value.name)
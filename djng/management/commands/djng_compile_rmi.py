@@ -0,0 +1,66 @@
+import json
+import os
+from hashlib import md5
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import translation
+
+from djng.core.urlresolvers import get_all_remote_methods, get_rmi_script_name, get_url_patterns, is_language_prefixed
+
+
+SCRIPT_TEMPLATE = """/* generated by "manage.py djng_compile_rmi", version {version} */
+angular.module('djng.rmi').config(['djangoRMIProvider', function(djangoRMIProvider) {{
+	djangoRMIProvider.configure({remote_methods});
+}}]);
+"""
+
+URLS_SCRIPT_TEMPLATE = """angular.module('djng.urls').config(['djangoUrlProvider', function(djangoUrlProvider) {{
+	djangoUrlProvider.setUrlPatterns({url_patterns});
+}}]);
+"""
+
+
+class Command(BaseCommand):
+    help = "Write the configuration of all remote methods into a static file, to be loaded using {% djng_rmi_script %}."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output-dir',
+            help="Directory to write the static file into. Defaults to the first entry in STATICFILES_DIRS.",
+        )
+        parser.add_argument(
+            '--urls',
+            action='store_true',
+            help="Also add all named URL patterns, so that djangoUrl.reverse() resolves URLs on the client.",
+        )
+
+    def handle(self, output_dir=None, urls=False, **options):
+        if output_dir is None:
+            if not getattr(settings, 'STATICFILES_DIRS', None):
+                raise CommandError("Add an output directory using '--output-dir' or configure STATICFILES_DIRS.")
+            output_dir = settings.STATICFILES_DIRS[0]
+            if isinstance(output_dir, (list, tuple)):
+                raise CommandError("The first entry in STATICFILES_DIRS uses a prefix. Add an output directory using '--output-dir'.")
+        if is_language_prefixed():
+            # URLs created by i18n_patterns() differ per language, hence write one file per language
+            for language, _ in settings.LANGUAGES:
+                with translation.override(language):
+                    self.write_script(output_dir, urls, language)
+        else:
+            self.write_script(output_dir, urls)
+
+    def write_script(self, output_dir, urls, language=None):
+        remote_methods = json.dumps(get_all_remote_methods(), sort_keys=True, separators=(',', ':'))
+        url_patterns = json.dumps(get_url_patterns(), sort_keys=True, separators=(',', ':')) if urls else ''
+        content = SCRIPT_TEMPLATE.format(
+            version=md5((remote_methods + url_patterns).encode('utf-8')).hexdigest()[:12],
+            remote_methods=remote_methods,
+        )
+        if urls:
+            content += URLS_SCRIPT_TEMPLATE.format(url_patterns=url_patterns)
+        filename = os.path.join(output_dir, *get_rmi_script_name(language).split('/'))
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        with open(filename, 'w', encoding='utf-8') as fh:
+            fh.write(content)
+        self.stdout.write("Wrote remote method configuration to '{}'.".format(filename))
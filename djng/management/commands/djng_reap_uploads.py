@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from djng.core.uploads import reap_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Delete expired files from the folder holding uploaded files, whose forms have not been submitted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            help="Delete files not modified during this many seconds. Defaults to DJNG_UPLOAD_TEMP_MAX_AGE.",
+        )
+
+    def handle(self, max_age=None, **options):
+        count = reap_expired_uploads(max_age=max_age)
+        self.stdout.write("Deleted {} expired uploaded files.".format(count))
@@ -1,11 +1,17 @@
+from functools import lru_cache
+
 from django import http
-from django.urls import reverse
-from django.utils.http import unquote
+from django.conf import settings
+from django.urls import get_script_prefix, get_urlconf, reverse
+from django.utils.http import unquote, urlencode
+from django.utils.translation import get_language
 try:
     from django.utils.deprecation import MiddlewareMixin
 except ImportError:
     MiddlewareMixin = object
 
+from djng import app_settings
+
 
 class AngularUrlMiddleware(MiddlewareMixin):
     """
@@ -15,6 +21,21 @@ class AngularUrlMiddleware(MiddlewareMixin):
     """
     ANGULAR_REVERSE = '/angular/reverse/'
 
+    def __init__(self, *args, **kwargs):
+        super(AngularUrlMiddleware, self).__init__(*args, **kwargs)
+        cache_size = app_settings.REVERSE_CACHE_SIZE
+        if cache_size:
+            self.reverse_url = lru_cache(maxsize=cache_size)(self.reverse_url)
+
+    def reverse_url(self, urlconf, script_prefix, language, url_name, url_args, url_kwargs):
+        """
+        Returns the unquoted URL for the given name, args and kwargs. If enabled through the setting
+        ``DJNG_REVERSE_CACHE_SIZE``, results are memoized. Therefore all arguments must be hashable,
+        and ``urlconf``, ``script_prefix`` and ``language`` are part of the cache key, since they may
+        change the reversed URL.
+        """
+        return unquote(reverse(url_name, urlconf=urlconf, args=url_args, kwargs=dict(url_kwargs)))
+
     def process_request(self, request):
         """
         Reads url name, args, kwargs from GET parameters, reverses the url and resolves view function
@@ -37,31 +58,33 @@ class AngularUrlMiddleware(MiddlewareMixin):
         So we ignore args and kwargs that are empty strings.
         """
         if request.path == self.ANGULAR_REVERSE:
-            url_name = request.GET.get('djng_url_name')
-            url_args = request.GET.getlist('djng_url_args', [])
-            url_kwargs = {}
-
-            # Remove falsy values (empty strings)
-            url_args = filter(lambda x: x, url_args)
+            url_name = None
+            url_args = ()
+            url_kwargs = []
+            query = []
 
-            # Read kwargs
-            for param in request.GET:
-                if param.startswith('djng_url_kwarg_'):
-                    # Ignore kwargs that are empty strings
-                    if request.GET[param]:
-                        url_kwargs[param[15:]] = request.GET[param]  # [15:] to remove 'djng_url_kwarg' prefix
+            # Split the GET parameters into url name, args, kwargs and those to be kept, in one pass
+            for key, values in request.GET.lists():
+                if not key.startswith('djng_url'):
+                    query.append((key, values))
+                elif key == 'djng_url_name':
+                    url_name = values[-1]
+                elif key == 'djng_url_args':
+                    # Remove falsy values (empty strings)
+                    url_args = tuple(value for value in values if value)
+                elif key.startswith('djng_url_kwarg_') and values[-1]:
+                    # Ignore kwargs that are empty strings, [15:] to remove 'djng_url_kwarg_' prefix
+                    url_kwargs.append((key[15:], values[-1]))
 
-            url = unquote(reverse(url_name, args=url_args, kwargs=url_kwargs))
+            urlconf = get_urlconf() or settings.ROOT_URLCONF
+            url = self.reverse_url(urlconf, get_script_prefix(), get_language(), url_name,
+                                   url_args, tuple(sorted(url_kwargs)))
             assert not url.startswith(self.ANGULAR_REVERSE), "Prevent recursive requests"
 
             # rebuild the request object with a different environ
             request.path = request.path_info = url
             request.environ['PATH_INFO'] = url
-            query = request.GET.copy()
-            for key in request.GET:
-                if key.startswith('djng_url'):
-                    query.pop(key, None)
-            request.environ['QUERY_STRING'] = query.urlencode()
+            request.environ['QUERY_STRING'] = urlencode(query, doseq=True)
 
             # Reconstruct GET QueryList in the same way WSGIRequest.GET function works
             request.GET = http.QueryDict(request.environ['QUERY_STRING'])
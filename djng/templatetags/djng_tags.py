@@ -1,12 +1,14 @@
 import json
 
 from django.template import Library
+from django.templatetags.static import static
 from django.template.base import Node, NodeList, TextNode, VariableNode
 from django.utils.html import format_html
 from django.utils.safestring import mark_safe
-from django.utils.translation import get_language_from_request
+from django.utils.translation import get_language, get_language_from_request
 
-from djng.core.urlresolvers import get_all_remote_methods, get_current_remote_methods
+from djng.core.urlresolvers import (get_all_remote_methods, get_current_remote_methods, get_rmi_script_name,
+                                    get_url_patterns)
 
 
 register = Library()
@@ -22,6 +24,18 @@ def djng_all_rmi():
     return mark_safe(json.dumps(get_all_remote_methods()))
 
 
+@register.simple_tag(name='djng_rmi_script')
+def djng_rmi_script():
+    """
+    Returns a script tag loading the configuration of all methods for all Views available for this
+    project, marked with the ``@allow_remote_invocation`` decorator. This static file must have been
+    created beforehand using ``./manage.py djng_compile_rmi``. It has to be included after
+    ``django-angular.js``, and replaces the call of ``djangoRMIProvider.configure({­% djng_all_rmi %­});``
+    If the URLs are prefixed by the language, the file for the active language is loaded.
+    """
+    return format_html('<script src="{}"></script>', static(get_rmi_script_name(get_language())))
+
+
 @register.simple_tag(name='djng_current_rmi', takes_context=True)
 def djng_current_rmi(context):
     """
@@ -32,6 +46,17 @@ def djng_current_rmi(context):
     return mark_safe(json.dumps(get_current_remote_methods(context.get('view'))))
 
 
+@register.simple_tag(name='djng_url_patterns')
+def djng_url_patterns():
+    """
+    Returns a dictionary of all named URL patterns available for this project. The return string
+    can be used directly to initialize the AngularJS provider, such as
+    ``djangoUrlProvider.setUrlPatterns({­% djng_url_patterns %­});``, so that ``djangoUrl.reverse()``
+    resolves URLs on the client rather than through ``AngularUrlMiddleware``.
+    """
+    return mark_safe(json.dumps(get_url_patterns(), separators=(',', ':')).replace('<', '\\u003c'))
+
+
 @register.simple_tag(name='load_djng_urls', takes_context=True)
 def djng_urls(context, *namespaces):
     raise DeprecationWarning(
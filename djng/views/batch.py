@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import copy
+import json
+
+from django.core.handlers.exception import response_for_exception
+from django.http import QueryDict
+from django.urls import Resolver404, get_script_prefix, resolve
+from django.utils.datastructures import MultiValueDict
+from django.views.generic import View
+
+from djng.views.mixins import (JSONBaseMixin, JSONResponseException, JSONResponseMixin, as_async_view,
+                               await_handler)
+
+try:
+    from asgiref.sync import async_to_sync
+except ImportError:  # Django < 3.0
+    async_to_sync = None
+
+
+class RMIBatchView(JSONBaseMixin, View):
+    """
+    View to invoke many remote methods using one single HTTP request.
+
+    The request body must contain a list of invocations. Each of them is an object with the keys
+    ``url`` and ``method``, naming the remote method exactly as configured by ``djangoRMIProvider``,
+    and optionally ``data``, in which case the method is invoked using POST rather than GET.
+    Each invocation is dispatched onto its view as if it were requested separately, and hence
+    passes the same checks for ``@allow_remote_invocation``. Middleware however only processes
+    the batch request itself.
+
+    The response contains a list of objects with the keys ``status`` and ``data``, in the same
+    order as the invocations.
+    """
+    http_method_names = ['post']
+    max_batch_size = 50
+
+    def post(self, request, *args, **kwargs):
+        try:
+            invocations = self.get_invocations(request)
+        except JSONResponseException as e:
+            return self.json_response({'message': e.args[0]}, e.status_code)
+        return self.json_response([self.invoke(request, invocation) for invocation in invocations])
+
+    def get_invocations(self, request):
+        try:
+            invocations = json.loads(request.body.decode('utf-8'))
+        except ValueError:
+            invocations = None
+        if not isinstance(invocations, list) or not all(isinstance(inv, dict) for inv in invocations):
+            raise JSONResponseException("Expected a list of invocations")
+        if len(invocations) > self.max_batch_size:
+            raise JSONResponseException("At most {0} invocations are allowed per request"
+                                        .format(self.max_batch_size), 413)
+        return invocations
+
+    def prepare_invocation(self, request, invocation):
+        """
+        Returns the view function handling the given invocation, a request object derived from the
+        batch request, and the resolved URL. If the invocation can not be dispatched, returns a
+        dictionary containing the error result instead.
+        """
+        url, remote_method = invocation.get('url'), invocation.get('method')
+        script_prefix = get_script_prefix()
+        if not isinstance(url, str) or not isinstance(remote_method, str) or not url.startswith(script_prefix):
+            return {'status': 400, 'data': {'message': "Invalid invocation"}}
+        path_info = '/' + url[len(script_prefix):]
+        try:
+            match = resolve(path_info)
+        except Resolver404:
+            return {'status': 404, 'data': {'message': "No view found for '{0}'".format(url)}}
+        view_class = getattr(match.func, 'view_class', None)
+        if not (isinstance(view_class, type) and issubclass(view_class, JSONResponseMixin)):
+            return {'status': 404, 'data': {'message': "No remote method '{0}' found for '{1}'".format(remote_method, url)}}
+        if remote_method not in view_class.get_remote_methods():
+            if not callable(getattr(view_class, remote_method, None)):
+                return {'status': 404, 'data': {'message': "No remote method '{0}' found for '{1}'".format(remote_method, url)}}
+            return {'status': 403, 'data': {'message': "Method '{0}.{1}' has no decorator '@allow_remote_invocation'"
+                                                       .format(view_class.__name__, remote_method)}}
+
+        sub_request = copy.copy(request)
+        sub_request.method = 'POST' if 'data' in invocation else 'GET'
+        sub_request.path, sub_request.path_info = url, path_info
+        sub_request.META = dict(request.META, REQUEST_METHOD=sub_request.method, PATH_INFO=path_info,
+                                QUERY_STRING='', CONTENT_TYPE='application/json',
+                                HTTP_DJNG_REMOTE_METHOD=remote_method, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        # the results are decoded and merged into the response of the batch, which itself may be compressed
+        sub_request.META.pop('HTTP_ACCEPT_ENCODING', None)
+        sub_request.GET = QueryDict()
+        sub_request._post, sub_request._files = QueryDict(), MultiValueDict()
+        sub_request._body = json.dumps(invocation['data']).encode('utf-8') if 'data' in invocation else b''
+        sub_request.resolver_match = match
+        return match.func, sub_request, match
+
+    def invoke(self, request, invocation):
+        prepared = self.prepare_invocation(request, invocation)
+        if isinstance(prepared, dict):
+            return prepared
+        view, sub_request, match = prepared
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        try:
+            response = view(sub_request, *match.args, **match.kwargs)
+        except Exception as exc:
+            response = response_for_exception(sub_request, exc)
+        return self.get_result(response)
+
+    def get_result(self, response):
+        """
+        Convert the response of a single invocation into its result.
+        """
+        if callable(getattr(response, 'render', None)):
+            response.render()
+        data = None
+        if response.get('Content-Type', '').startswith('application/json'):
+            if response.streaming:
+                content = b''.join(response.streaming_content)
+            else:
+                content = response.content
+            data = json.loads(content.decode(response.charset))
+        return {'status': response.status_code, 'data': data}
+
+
+class AsyncRMIBatchView(RMIBatchView):
+    """
+    Counterpart of ``RMIBatchView`` for views running under ASGI. All invocations are dispatched
+    concurrently. Views derived from ``AsyncJSONResponseMixin`` are awaited, all other views are
+    run in a thread.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return as_async_view(super(AsyncRMIBatchView, cls).as_view(**initkwargs))
+
+    async def post(self, request, *args, **kwargs):
+        try:
+            invocations = self.get_invocations(request)
+        except JSONResponseException as e:
+            return self.json_response({'message': e.args[0]}, e.status_code)
+        results = await asyncio.gather(*[self.invoke_async(request, invocation) for invocation in invocations])
+        return self.json_response(list(results))
+
+    async def invoke_async(self, request, invocation):
+        prepared = self.prepare_invocation(request, invocation)
+        if isinstance(prepared, dict):
+            return prepared
+        view, sub_request, match = prepared
+        try:
+            response = await await_handler(view, sub_request, *match.args, **match.kwargs)
+        except Exception as exc:
+            response = response_for_exception(sub_request, exc)
+        return self.get_result(response)
@@ -1,18 +1,48 @@
 # -*- coding: utf-8 -*-
 import json
+from hashlib import md5
+from itertools import islice
 
-from django.core.exceptions import ValidationError
-from django.core import serializers
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core import serializers, signing
+from django.db import connections, router, transaction
+from django.db.models import Count, F, Field, Max, Q, QuerySet
 from django.forms.models import modelform_factory
+from django.utils.cache import quote_etag
+from django.utils.encoding import is_protected_type
 from django.views.generic import FormView
 
-from djng.views.mixins import JSONBaseMixin, JSONResponseException
+from djng.views.mixins import JSONBaseMixin, JSONResponseException, as_async_view, await_handler
 
 
 class NgMissingParameterError(ValueError):
     pass
 
 
+class _ValueRow(object):
+    """
+    Stand-in for a model instance, so that ``Field.value_to_string()`` can be applied onto a
+    value fetched through ``QuerySet.values_list()``.
+    """
+    def __init__(self, attname, value):
+        setattr(self, attname, value)
+
+
+def _get_value_converter(field):
+    """
+    Return a function converting a value of the given field in the same way as the 'python'
+    serializer does: Protected types are passed through as is, all other values are converted
+    into strings.
+    """
+    if type(field).value_to_string is Field.value_to_string:
+        def convert(value):
+            return value if is_protected_type(value) else str(value)
+    else:
+        def convert(value):
+            return value if is_protected_type(value) else field.value_to_string(_ValueRow(field.attname, value))
+    return convert
+
+
 class NgCRUDView(JSONBaseMixin, FormView):
     """
     Basic view to support default angular $resource CRUD actions on server side
@@ -21,6 +51,16 @@ class NgCRUDView(JSONBaseMixin, FormView):
     Optional 'pk' GET parameter must be passed when object identification is required (save to update and delete)
 
     If fields != None the serialized data will only contain field names from fields array
+
+    If use_values_serializer is True, querysets are serialized using QuerySet.values_list()
+    instead of Django's 'python' serializer, which avoids the instantiation of model objects
+
+    If stream_chunk_size != None, ng_query streams its response, serializing chunks of that many
+    objects at a time
+
+    If paginate_by != None, ng_query returns at most that many objects per request. The next page
+    is announced through the HTTP header 'DjNg-Next-Offset', or 'DjNg-Next-Cursor' if keyset_field
+    is set, so that the response body remains a flat array as expected by $resource.query()
     """
     model = None
     fields = None
@@ -28,6 +68,20 @@ class NgCRUDView(JSONBaseMixin, FormView):
     slug_field = 'slug'
     serializer_name = 'python'
     serialize_natural_keys = False
+    use_values_serializer = False
+    values_serializer_batch_size = 500
+    stream_chunk_size = None
+    last_modified_field = None
+    allow_bulk = False
+    use_bulk_queries = False
+    max_bulk_items = 1000
+
+    paginate_by = None
+    max_paginate_by = None
+    keyset_field = None
+    limit_param = 'limit'
+    offset_param = 'offset'
+    cursor_param = 'cursor'
 
     allowed_methods = ['GET', 'POST', 'DELETE']
     exclude_methods = []
@@ -43,30 +97,51 @@ class NgCRUDView(JSONBaseMixin, FormView):
         * $save - ng_save
         * $delete and $remove - ng_delete
         """
-        allowed_methods = self.get_allowed_methods()
         try:
-            if request.method == 'GET' and 'GET' in allowed_methods:
-                if 'pk' in request.GET or self.slug_field in request.GET:
-                    return self.ng_get(request, *args, **kwargs)
-                return self.ng_query(request, *args, **kwargs)
-            elif request.method == 'POST' and 'POST' in allowed_methods:
-                return self.ng_save(request, *args, **kwargs)
-            elif request.method == 'DELETE' and 'DELETE' in allowed_methods:
-                return self.ng_delete(request, *args, **kwargs)
-        except self.model.DoesNotExist as e:
-            return self.error_json_response(e.args[0], 404)
-        except NgMissingParameterError as e:
-            return self.error_json_response(e.args[0])
-        except JSONResponseException as e:
-            return self.error_json_response(e.args[0], e.status_code)
-        except ValidationError as e:
-            if hasattr(e, 'error_dict'):
-                return self.error_json_response('Form not valid', detail=e.message_dict)
-            else:
-                return self.error_json_response(e.message)
-
+            handler = self.get_ng_handler(request)
+            if handler is not None:
+                return handler(request, *args, **kwargs)
+        except Exception as e:
+            response = self.get_exception_response(e)
+            if response is None:
+                raise
+            return response
         return self.error_json_response('This view can not handle method {0}'.format(request.method), 405)
 
+    def get_ng_handler(self, request):
+        """
+        Returns the method handling the given request, or None if no method is allowed to.
+        """
+        allowed_methods = self.get_allowed_methods()
+        if request.method == 'GET' and 'GET' in allowed_methods:
+            if 'pk' in request.GET or self.slug_field in request.GET:
+                return self.ng_get
+            return self.ng_query
+        elif request.method == 'POST' and 'POST' in allowed_methods:
+            if self.allow_bulk and isinstance(self.get_request_data(), list):
+                return self.ng_bulk_save
+            return self.ng_save
+        elif request.method == 'DELETE' and 'DELETE' in allowed_methods:
+            if self.allow_bulk and len(request.GET.getlist('pk')) > 1:
+                return self.ng_bulk_delete
+            return self.ng_delete
+
+    def get_exception_response(self, exc):
+        """
+        Returns a JSON error response for exceptions raised while handling a request, or None if
+        the exception shall be propagated.
+        """
+        if isinstance(exc, self.model.DoesNotExist):
+            return self.error_json_response(exc.args[0], 404)
+        if isinstance(exc, NgMissingParameterError):
+            return self.error_json_response(exc.args[0])
+        if isinstance(exc, JSONResponseException):
+            return self.error_json_response(exc.args[0], exc.status_code)
+        if isinstance(exc, ValidationError):
+            if hasattr(exc, 'error_dict'):
+                return self.error_json_response('Form not valid', detail=exc.message_dict)
+            return self.error_json_response(exc.message)
+
     def get_form_class(self):
         """
         Build ModelForm from model
@@ -88,6 +163,11 @@ class NgCRUDView(JSONBaseMixin, FormView):
         Return serialized queryset or single object as python dictionary
         serialize() only works on iterables, so to serialize a single object we put it in a list
         """
+        if self.use_values_serializer and isinstance(queryset, QuerySet):
+            object_data = self.serialize_values(queryset)
+            if object_data is not None:
+                return object_data
+
         object_data = []
         is_queryset = False
         query_fields = self.get_fields()
@@ -108,17 +188,106 @@ class NgCRUDView(JSONBaseMixin, FormView):
             return object_data
         return object_data[0]  # If there's only one object
 
+    def serialize_values(self, queryset):
+        """
+        Return the serialized queryset as a list of python dictionaries, identical to the output
+        of serialize_queryset(), but fetch only the selected fields using QuerySet.values_list().
+        Many-to-many relations are fetched using one additional query per field.
+        Returns None, if the model can not be serialized this way.
+        """
+        values_fields = self.get_values_fields(queryset.model)
+        if values_fields is None:
+            return None
+        return [obj for chunk in self._iterate_values(queryset, values_fields) for obj in chunk]
+
+    def iterate_serialized(self, queryset, chunk_size):
+        """
+        Generator yielding the serialized queryset as lists of python dictionaries, each with at
+        most chunk_size elements. Only chunk_size model instances are kept in memory at a time.
+        """
+        values_fields = self.use_values_serializer and self.get_values_fields(queryset.model)
+        if values_fields:
+            yield from self._iterate_values(queryset, values_fields, chunk_size)
+            return
+        iterator = queryset.iterator(chunk_size=chunk_size)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                break
+            yield self.serialize_queryset(chunk)
+
+    def get_values_fields(self, model):
+        """
+        Return the regular and the many-to-many fields to be serialized by serialize_values(),
+        or None, if the model can not be serialized this way.
+        """
+        query_fields = self.get_fields()
+        opts = model._meta.concrete_model._meta
+        fields = [field for field in opts.local_fields if field.serialize and
+                  (query_fields is None or field.name in query_fields)]
+        m2m_fields = [field for field in opts.local_many_to_many if field.serialize and
+                      field.remote_field.through._meta.auto_created and
+                      (query_fields is None or field.name in query_fields)]
+        if any(field.remote_field.is_hidden() for field in m2m_fields):
+            return None
+        return fields, m2m_fields
+
+    def _iterate_values(self, queryset, values_fields, chunk_size=None):
+        fields, m2m_fields = values_fields
+        pk_field = queryset.model._meta.concrete_model._meta.pk
+        names = [field.name for field in fields]
+        converters = [_get_value_converter(field) for field in fields]
+        convert_pk = _get_value_converter(pk_field)
+        rows = queryset.values_list(pk_field.attname, *[field.attname for field in fields])
+        if chunk_size:
+            rows = rows.iterator(chunk_size=chunk_size)
+        rows = iter(rows)
+        while True:
+            object_data, objects_by_pk = [], {}
+            for row in islice(rows, chunk_size):
+                obj = {name: convert(value) for name, convert, value in zip(names, converters, row[1:])}
+                object_data.append(obj)
+                objects_by_pk[row[0]] = obj
+                for field in m2m_fields:
+                    obj[field.name] = []
+                obj['pk'] = convert_pk(row[0])
+            if not object_data:
+                break
+
+            pks = list(objects_by_pk)
+            for field in m2m_fields:
+                related_model = field.remote_field.model
+                query_name = field.related_query_name()
+                convert = _get_value_converter(related_model._meta.pk)
+                for offset in range(0, len(pks), self.values_serializer_batch_size):
+                    batch = pks[offset:offset + self.values_serializer_batch_size]
+                    related_pks = related_model._default_manager.filter(**{query_name + '__in': batch}) \
+                        .values_list(query_name, 'pk')
+                    for pk, related_pk in related_pks:
+                        objects_by_pk[pk][field.name].append(convert(related_pk))
+            yield object_data
+            if not chunk_size:
+                break
+
     def get_form_kwargs(self):
         kwargs = super(NgCRUDView, self).get_form_kwargs()
         # Since angular sends data in JSON rather than as POST parameters, the default data (request.POST)
         # is replaced with request.body that contains JSON encoded data
-        kwargs['data'] = json.loads(self.request.body.decode('utf-8'))
+        kwargs['data'] = self.get_request_data()
 
         # Add instance if object identifier present
         if 'pk' in self.request.GET or self.slug_field in self.request.GET:
             kwargs['instance'] = self.get_object()
         return kwargs
 
+    def get_request_data(self):
+        """
+        Return the JSON encoded request body as python object, decoded only once per request.
+        """
+        if not hasattr(self, '_request_data'):
+            self._request_data = json.loads(self.request.body.decode('utf-8'))
+        return self._request_data
+
     def get_object(self):
         if 'pk' in self.request.GET:
             return self.model.objects.get(pk=self.request.GET['pk'])
@@ -141,19 +310,175 @@ class NgCRUDView(JSONBaseMixin, FormView):
         """
         return self.model.objects.all()
 
+    def get_paginate_by(self):
+        """
+        Get the number of objects to return per page, or None if ng_query shall not paginate.
+        The client may ask for a smaller or bigger page using the 'limit' GET parameter.
+        """
+        if self.paginate_by is None:
+            return None
+        page_size = self._get_int_param(self.limit_param, self.paginate_by)
+        if page_size < 1:
+            raise JSONResponseException("GET parameter '{0}' must be positive.".format(self.limit_param))
+        if self.max_paginate_by is not None:
+            page_size = min(page_size, self.max_paginate_by)
+        return page_size
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        Return the slice of the queryset belonging to the requested page, with one extra object
+        to find out whether there is a next page, and the offset of that slice.
+        """
+        if self.keyset_field:
+            ordering = self.get_keyset_ordering()
+            queryset = queryset.order_by(*ordering)
+            cursor = self.request.GET.get(self.cursor_param)
+            if cursor:
+                queryset = queryset.filter(self.get_keyset_filter(cursor, ordering))
+            return queryset[:page_size + 1], 0
+        offset = self._get_int_param(self.offset_param, 0)
+        if offset < 0:
+            raise JSONResponseException("GET parameter '{0}' must not be negative.".format(self.offset_param))
+        return queryset[offset:offset + page_size + 1], offset
+
+    def get_keyset_ordering(self):
+        """
+        Order by the keyset field, using the primary key as tie breaker for non-unique values.
+        If the keyset field is nullable, NULL values are ordered last, regardless of the database.
+        """
+        descending = self.keyset_field.startswith('-')
+        field_name = self.keyset_field.lstrip('-')
+        if field_name == 'pk':
+            return [self.keyset_field]
+        tie_breaker = '-pk' if descending else 'pk'
+        if self._keyset_field_is_nullable():
+            if descending:
+                return [F(field_name).desc(nulls_last=True), tie_breaker]
+            return [F(field_name).asc(nulls_last=True), tie_breaker]
+        return [self.keyset_field, tie_breaker]
+
+    def _keyset_field_is_nullable(self):
+        try:
+            return self.model._meta.get_field(self.keyset_field.lstrip('-')).null
+        except FieldDoesNotExist:
+            return False
+
+    def get_next_cursor(self, last_object):
+        """
+        Returns the signed cursor referring to the given serialized object, the last one on a page.
+        It contains the primary key and the value of the keyset field of that object, so that the
+        next page can be selected, even if that object has been deleted meanwhile.
+        """
+        field_name = self.keyset_field.lstrip('-')
+        if field_name == 'pk':
+            return signing.dumps([last_object['pk']], salt=self.cursor_salt)
+        value = last_object.get(field_name)
+        if field_name not in last_object or isinstance(value, (list, dict)):
+            # the keyset field is not serialized, or serialized as natural key
+            value = self.model._default_manager.filter(pk=last_object['pk']).values_list(field_name, flat=True)[0]
+        if not (value is None or isinstance(value, (bool, int, float, str))):
+            # dates, decimals, etc. are converted back by the field, when filtering the queryset
+            value = str(value)
+        return signing.dumps([last_object['pk'], value], salt=self.cursor_salt)
+
+    def get_keyset_filter(self, cursor, ordering):
+        """
+        Convert the cursor, referring to the last object on the previous page, into a filter
+        selecting all objects following that one, according to the given ordering.
+        """
+        try:
+            cursor = signing.loads(cursor, salt=self.cursor_salt)
+            last_pk, last_value = (cursor + [None])[:2]
+        except (signing.BadSignature, TypeError, ValueError):
+            raise JSONResponseException("Invalid value for GET parameter '{0}'.".format(self.cursor_param))
+        lookup = 'lt' if self.keyset_field.startswith('-') else 'gt'
+        if len(ordering) == 1:
+            return Q(**{'pk__' + lookup: last_pk})
+        field_name = self.keyset_field.lstrip('-')
+        if last_value is None:
+            # NULL values are ordered last, hence only other NULL values can follow
+            return Q(**{field_name + '__isnull': True, 'pk__' + lookup: last_pk})
+        keyset_filter = Q(**{field_name + '__' + lookup: last_value}) | Q(**{field_name: last_value, 'pk__' + lookup: last_pk})
+        if self._keyset_field_is_nullable():
+            keyset_filter |= Q(**{field_name + '__isnull': True})
+        return keyset_filter
+
+    @property
+    def cursor_salt(self):
+        return 'djng.crud.{0}.cursor'.format(self.model._meta.label_lower)
+
+    def _get_int_param(self, param, default):
+        try:
+            return int(self.request.GET.get(param, default))
+        except ValueError:
+            raise JSONResponseException("GET parameter '{0}' must be an integer.".format(param))
+
+    def get_queryset_validators(self, queryset):
+        """
+        Return the ETag and the Last-Modified timestamp for the queryset used by ng_query, derived
+        from the number of objects and the most recent value of last_modified_field.
+        """
+        if not self.last_modified_field:
+            return {}
+        aggregates = queryset.aggregate(last_modified=Max(self.last_modified_field), count=Count('pk'))
+        etag = '{count}:{last_modified}'.format(**aggregates)
+        return {'etag': quote_etag(md5(etag.encode('utf-8')).hexdigest()), 'last_modified': aggregates['last_modified']}
+
+    def get_object_validators(self, obj):
+        """
+        Return the ETag and the Last-Modified timestamp for the object used by ng_get.
+        """
+        if not self.last_modified_field:
+            return {}
+        last_modified = getattr(obj, self.last_modified_field)
+        etag = '{0}:{1}'.format(obj.pk, last_modified)
+        return {'etag': quote_etag(md5(etag.encode('utf-8')).hexdigest()), 'last_modified': last_modified}
+
     def ng_query(self, request, *args, **kwargs):
         """
         Used when angular's query() method is called
-        Build an array of all objects, return json response
+        Build an array of all objects, or of the requested page if paginating, return json response
+        If the client's copy still is valid, skip serialization and respond with 304 Not Modified
         """
-        return self.build_json_response(self.get_queryset())
+        queryset = self.get_queryset()
+        validators = self.get_queryset_validators(queryset)
+        response = self.conditional_response(request, **validators)
+        if response is None:
+            response = self.conditional_response(request, self.build_query_response(queryset), **validators)
+        return response
+
+    def build_query_response(self, queryset):
+        page_size = self.get_paginate_by()
+        if page_size is None:
+            if self.stream_chunk_size:
+                chunks = self.iterate_serialized(queryset, self.stream_chunk_size)
+                return self.json_streaming_response(chunks, separators=(',', ':'))
+            return self.build_json_response(queryset)
+
+        queryset, offset = self.paginate_queryset(queryset, page_size)
+        object_data = self.serialize_queryset(queryset)
+        has_next = len(object_data) > page_size
+        del object_data[page_size:]
+        response = self.json_response(object_data, separators=(',', ':'))
+        if has_next:
+            if self.keyset_field:
+                response['DjNg-Next-Cursor'] = self.get_next_cursor(object_data[-1])
+            else:
+                response['DjNg-Next-Offset'] = offset + page_size
+        return response
 
     def ng_get(self, request, *args, **kwargs):
         """
         Used when angular's get() method is called
         Returns a JSON response of a single object dictionary
+        If the client's copy still is valid, skip serialization and respond with 304 Not Modified
         """
-        return self.build_json_response(self.get_object())
+        obj = self.get_object()
+        validators = self.get_object_validators(obj)
+        response = self.conditional_response(request, **validators)
+        if response is None:
+            response = self.conditional_response(request, self.build_json_response(obj), **validators)
+        return response
 
     def ng_save(self, request, *args, **kwargs):
         """
@@ -167,6 +492,125 @@ class NgCRUDView(JSONBaseMixin, FormView):
 
         raise ValidationError(form.errors)
 
+    def ng_bulk_save(self, request, *args, **kwargs):
+        """
+        Called on POST with an array of objects, if allow_bulk is set
+        Validate each item with the modelform and save all valid items in one transaction. Items
+        containing a 'pk' update the existing object, all others are created
+        Returns an array with one result per item, each containing the HTTP status code and either
+        the serialized object or the error messages
+        """
+        items = self.get_request_data()
+        if len(items) > self.max_bulk_items:
+            raise JSONResponseException("Too many items, at most {0} are allowed.".format(self.max_bulk_items))
+        form_class = self.get_form_class()
+        pks = {}
+        for index, item in enumerate(items):
+            if isinstance(item, dict) and item.get('pk') is not None:
+                try:
+                    pks[index] = self.model._meta.pk.to_python(item['pk'])
+                except ValidationError:
+                    pks[index] = None
+        instances = self.model._default_manager.in_bulk([pk for pk in pks.values() if pk is not None])
+        results, validated, seen_pks = [], [], set()
+        for index, item in enumerate(items):
+            if not isinstance(item, dict):
+                results.append({'status': 400, 'message': "Item is not an object"})
+                continue
+            instance = None
+            if index in pks:
+                if pks[index] is None:
+                    results.append({'status': 400, 'message': "Invalid value pk={0}".format(item['pk'])})
+                    continue
+                if pks[index] in seen_pks:
+                    # both items would modify the same instance
+                    results.append({'status': 400, 'message': "Duplicate value pk={0}".format(item['pk'])})
+                    continue
+                seen_pks.add(pks[index])
+                instance = instances.get(pks[index])
+                if instance is None:
+                    results.append({'status': 404, 'message': "Object with pk={0} does not exist".format(item['pk'])})
+                    continue
+            form = form_class(data=item, instance=instance, initial=self.get_initial(), prefix=self.get_prefix())
+            if form.is_valid():
+                validated.append((len(results), form, instance is None))
+                results.append(None)
+            else:
+                results.append({'status': 400, 'message': 'Form not valid',
+                                'detail': ValidationError(form.errors).message_dict})
+
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            objects = self.bulk_save_forms([form for _, form, _ in validated], form_class)
+        for (index, _, created), data in zip(validated, self.serialize_queryset(objects)):
+            results[index] = {'status': 201 if created else 200, 'data': data}
+        return self.json_response(results, separators=(',', ':'))
+
+    def bulk_save_forms(self, forms, form_class):
+        """
+        Save the objects of all validated forms and return them. If use_bulk_queries is set, this
+        is done using bulk_create() and bulk_update(), which bypass Model.save() and the signals
+        pre_save and post_save
+        """
+        if not self.use_bulk_queries:
+            return [form.save() for form in forms]
+
+        objects = [form.save(commit=False) for form in forms]
+        created = [obj for obj in objects if obj._state.adding]
+        updated = [obj for obj in objects if not obj._state.adding]
+        connection = connections[router.db_for_write(self.model)]
+        if getattr(connection.features, 'can_return_rows_from_bulk_insert',
+                   getattr(connection.features, 'can_return_ids_from_bulk_insert', False)):
+            self.model._default_manager.bulk_create(created)
+        else:
+            # the primary keys of the created objects are required for the response
+            for obj in created:
+                obj.save()
+        update_fields = [field.name for field in self.model._meta.concrete_fields
+                         if not field.primary_key and field.name in form_class.base_fields]
+        if updated and update_fields:
+            if hasattr(QuerySet, 'bulk_update'):
+                self.model._default_manager.bulk_update(updated, update_fields)
+            else:  # Django < 2.2
+                for obj in updated:
+                    obj.save(update_fields=update_fields)
+        for form in forms:
+            form.save_m2m()
+        return objects
+
+    def ng_bulk_delete(self, request, *args, **kwargs):
+        """
+        Called on DELETE with more than one 'pk' GET parameter, if allow_bulk is set
+        Delete all objects with the given primary keys in one transaction
+        Returns an array with one result per primary key, each containing the HTTP status code and
+        either the serialized object or the error message
+        """
+        values = request.GET.getlist('pk')
+        if len(values) > self.max_bulk_items:
+            raise JSONResponseException("Too many items, at most {0} are allowed.".format(self.max_bulk_items))
+        pks = []
+        for value in values:
+            try:
+                pks.append(self.model._meta.pk.to_python(value))
+            except ValidationError:
+                pks.append(None)
+        queryset = self.model._default_manager.filter(pk__in=[pk for pk in pks if pk is not None])
+        results, seen_pks = [], set()
+        with transaction.atomic(using=router.db_for_write(self.model)):
+            objects = list(queryset)
+            object_data = {obj.pk: data for obj, data in zip(objects, self.serialize_queryset(objects))}
+            for value, pk in zip(values, pks):
+                if pk is None:
+                    results.append({'status': 400, 'message': "Invalid value pk={0}".format(value)})
+                elif pk in seen_pks:
+                    results.append({'status': 400, 'message': "Duplicate value pk={0}".format(value)})
+                elif pk not in object_data:
+                    results.append({'status': 404, 'message': "Object with pk={0} does not exist".format(value)})
+                else:
+                    results.append({'status': 200, 'data': object_data[pk]})
+                seen_pks.add(pk)
+            queryset.delete()
+        return self.json_response(results, separators=(',', ':'))
+
     def ng_delete(self, request, *args, **kwargs):
         """
         Delete object and return it's data in JSON encoding
@@ -181,3 +625,32 @@ class NgCRUDView(JSONBaseMixin, FormView):
         response = self.build_json_response(obj)
         obj.delete()
         return response
+
+
+class AsyncNgCRUDView(NgCRUDView):
+    """
+    Counterpart of ``NgCRUDView`` for views running under ASGI. The handlers ``ng_query``,
+    ``ng_get``, ``ng_save``, ``ng_delete``, ``ng_bulk_save`` and ``ng_bulk_delete`` may be
+    overridden by coroutine functions, which are awaited. All other handlers access the database
+    synchronously and therefore are run in a thread through ``sync_to_async``.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return as_async_view(super(AsyncNgCRUDView, cls).as_view(**initkwargs))
+
+    def iterate_serialized(self, queryset, chunk_size):
+        # Django's ASGI handler iterates streaming responses within the event loop, where the
+        # database must not be accessed. Hence all chunks are read while handling the request.
+        return iter(list(super(AsyncNgCRUDView, self).iterate_serialized(queryset, chunk_size)))
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            handler = self.get_ng_handler(request)
+            if handler is not None:
+                return await await_handler(handler, request, *args, **kwargs)
+        except Exception as e:
+            response = self.get_exception_response(e)
+            if response is None:
+                raise
+            return response
+        return self.error_json_response('This view can not handle method {0}'.format(request.method), 405)
@@ -1,8 +1,30 @@
 # -*- coding: utf-8 -*-
+import asyncio
 import json
+import uuid
 import warnings
+from calendar import timegm
+from datetime import datetime
+from functools import update_wrapper
+from hashlib import md5
+from types import MappingProxyType
+
+from django.core.cache import DEFAULT_CACHE_ALIAS, caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
 from django.core.serializers.json import DjangoJSONEncoder
-from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseForbidden, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers, set_response_etag
+from django.utils.http import http_date, parse_etags
+from django.utils.translation import get_language
+
+from djng import app_settings
+from djng.core.compression import compress_sequence, compress_string, get_accepted_encoding
+from djng.core.encoders import get_json_backend
+
+try:
+    from asgiref.sync import sync_to_async
+except ImportError:  # Django < 3.0
+    sync_to_async = None
 
 
 def allow_remote_invocation(func, method='auto'):
@@ -15,6 +37,35 @@ def allow_remote_invocation(func, method='auto'):
     return func
 
 
+def cache_remote_invocation(timeout=DEFAULT_TIMEOUT, vary_on_user=True, vary_on_language=True,
+                            cache_alias=DEFAULT_CACHE_ALIAS):
+    """
+    Cache the JSON encoded result of a method decorated with ``@allow_remote_invocation`` for
+    ``timeout`` seconds, using Django's cache framework. The cache key depends on the view class,
+    the request path, the view's URL arguments, the query string, the payload and, if enabled, on
+    the current user and the active language.
+    Call ``method.invalidate_cache()`` to discard all cached results of that method.
+    """
+    def decorator(func):
+        name = '{0}.{1}'.format(func.__module__, func.__qualname__)
+        generation_key = 'djng.rmi.generation:' + name
+
+        def invalidate_cache():
+            caches[cache_alias].delete(generation_key)
+
+        func.rmi_cache = {
+            'timeout': timeout,
+            'vary_on_user': vary_on_user,
+            'vary_on_language': vary_on_language,
+            'cache_alias': cache_alias,
+            'name': name,
+            'generation_key': generation_key,
+        }
+        func.invalidate_cache = invalidate_cache
+        return func
+    return decorator
+
+
 def allowed_action(func):
     warnings.warn("Decorator `@allowed_action` is deprecated. Use `@allow_remote_invocation` instead.", DeprecationWarning)
     return allow_remote_invocation(func)
@@ -35,14 +86,157 @@ class JSONResponseException(Exception):
 class JSONBaseMixin(object):
     """
     Basic mixin for encoding HTTP responses in JSON format.
+    The encoding is performed by the backend given by ``json_backend``, which defaults to the
+    setting ``DJNG_JSON_BACKEND``.
+    If ``compress_min_length`` is set, responses of at least that many bytes are compressed using
+    gzip or Brotli, as accepted by the client.
     """
     json_encoder = DjangoJSONEncoder
+    json_backend = None
     json_content_type = 'application/json;charset=UTF-8'
+    use_etag = False
+    compress_min_length = None
+    compress_level = None
+
+    def get_json_backend(self):
+        return get_json_backend(self.json_backend, self.json_encoder)
 
     def json_response(self, response_data, status=200, **kwargs):
-        out_data = json.dumps(response_data, cls=self.json_encoder, **kwargs)
-        response = HttpResponse(out_data, self.json_content_type, status=status)
+        out_data = self.get_json_backend().dumps(response_data, **kwargs)
+        return self.encoded_json_response(out_data, status)
+
+    def encoded_json_response(self, content, status=200):
+        """
+        Returns a response containing content, which already has been encoded to JSON.
+        """
+        response = HttpResponse(content, self.json_content_type, status=status)
+        response['Cache-Control'] = 'no-cache'
+        return self.compress_response(response)
+
+    def compress_response(self, response):
+        """
+        Compress the content of the given response, if enabled by ``compress_min_length`` and
+        accepted by the client. Streamed content is compressed regardless of its length.
+        """
+        request = getattr(self, 'request', None)
+        if self.compress_min_length is None or request is None or response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.compress_min_length:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = get_accepted_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        level = app_settings.JSON_COMPRESS_LEVEL if self.compress_level is None else self.compress_level
+        if response.streaming:
+            response.streaming_content = compress_sequence(response.streaming_content, encoding, level)
+            del response['Content-Length']
+        else:
+            response.content = compress_string(response.content, encoding, level)
+            response['Content-Length'] = str(len(response.content))
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
+
+    def get_rmi_cache_key(self, handler, *args):
+        """
+        Returns the cache key for invoking the given handler with the given arguments, or None if
+        the handler's result shall not be cached.
+        """
+        options = getattr(handler, 'rmi_cache', None)
+        if options is None:
+            return None
+        cache = caches[options['cache_alias']]
+        generation = cache.get(options['generation_key'])
+        if generation is None:
+            cache.add(options['generation_key'], uuid.uuid4().hex, None)
+            generation = cache.get(options['generation_key'])
+        request = getattr(self, 'request', None)
+        user = getattr(request, 'user', None)
+        vary_on = [
+            # the decorated method may be inherited by several views, each mounted on other URLs
+            '{0}.{1}'.format(type(self).__module__, type(self).__qualname__),
+            request.path if request is not None else None,
+            getattr(self, 'args', ()),
+            sorted(getattr(self, 'kwargs', {}).items()),
+            sorted(request.GET.lists()) if request is not None else None,
+            args,
+            user.pk if options['vary_on_user'] and user is not None and user.is_authenticated else None,
+            get_language() if options['vary_on_language'] else None,
+        ]
+        digest = md5(json.dumps(vary_on, cls=DjangoJSONEncoder, sort_keys=True).encode('utf-8')).hexdigest()
+        return 'djng.rmi:{0}:{1}:{2}'.format(options['name'], generation, digest)
+
+    def get_rmi_response(self, handler, *args):
+        """
+        Invoke the given handler and return its result as JSON response. If the handler has been
+        decorated with ``@cache_remote_invocation``, its encoded result is cached.
+        """
+        cache_key = self.get_rmi_cache_key(handler, *args)
+        if cache_key is None:
+            return self.json_response(handler(*args))
+        cache = caches[handler.rmi_cache['cache_alias']]
+        content = cache.get(cache_key)
+        if content is None:
+            content = self.get_json_backend().dumps(handler(*args))
+            cache.set(cache_key, content, handler.rmi_cache['timeout'])
+        return self.encoded_json_response(content)
+
+    def json_streaming_response(self, chunks, status=200, **kwargs):
+        """
+        Encode the elements of an iterable of lists as one single JSON array, while streaming it
+        to the client chunk by chunk. Errors raised while iterating can not be reported anymore.
+        """
+        def stream():
+            backend = self.get_json_backend()
+            prefix = b'['
+            for chunk in chunks:
+                if chunk:
+                    out_data = backend.dumps(chunk, **kwargs)
+                    if not isinstance(out_data, bytes):
+                        out_data = out_data.encode('utf-8')
+                    yield prefix + out_data[1:-1]
+                    prefix = b','
+            yield b'[]' if prefix == b'[' else b']'
+
+        response = StreamingHttpResponse(stream(), self.json_content_type, status=status)
         response['Cache-Control'] = 'no-cache'
+        return self.compress_response(response)
+
+    def conditional_response(self, request, response=None, etag=None, last_modified=None):
+        """
+        Add the validators 'ETag' and 'Last-Modified' to the response of a GET request and replace it
+        by '304 Not Modified', if the client's cached copy still is valid. If invoked without a
+        response, return None unless the client's copy still is valid, so that the caller can skip
+        building the response. If ``use_etag`` is set, the ETag defaults to a hash of the content.
+        The ETag of a compressed response is weak, since it also identifies the uncompressed content.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return response
+        if etag is None and self.use_etag and response is not None:
+            etag = set_response_etag(response).get('ETag')
+        if etag is None and last_modified is None:
+            return response
+        if isinstance(last_modified, datetime):
+            last_modified = timegm(last_modified.utctimetuple())
+        if etag and etag.startswith('"'):
+            if response is None:
+                # a '304 Not Modified' built without the response, repeats the validator held by the client
+                if 'W/' + etag in parse_etags(request.META.get('HTTP_IF_NONE_MATCH', '')):
+                    etag = 'W/' + etag
+            elif response.has_header('Content-Encoding'):
+                if response.get('ETag') == etag:
+                    response['ETag'] = 'W/' + etag
+                etag = 'W/' + etag
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified, response=response)
+        if response is not None:
+            if etag:
+                response.setdefault('ETag', etag)
+            if last_modified:
+                response.setdefault('Last-Modified', http_date(last_modified))
+            response.setdefault('Cache-Control', 'no-cache')
         return response
 
 
@@ -54,9 +248,52 @@ class JSONResponseMixin(JSONBaseMixin):
     list or dictionary which is serializable to JSON.
     The returned HTTP responses are of kind ``application/json;charset=UTF-8``.
     """
+    @classmethod
+    def get_remote_methods(cls):
+        """
+        Returns a read-only mapping of the names of all methods decorated with
+        ``@allow_remote_invocation`` onto a tuple of the function and its allowed HTTP method.
+        It is computed once per class.
+        """
+        try:
+            return cls.__dict__['_remote_methods']
+        except KeyError:
+            remote_methods = {}
+            for name in dir(cls):
+                member = getattr(cls, name, None)
+                if callable(member) and hasattr(member, 'allow_rmi'):
+                    remote_methods[name] = (member, member.allow_rmi)
+            cls._remote_methods = MappingProxyType(remote_methods)
+            return cls._remote_methods
+
     def get(self, request, *args, **kwargs):
-        if not request.is_ajax():
+        handler = self.get_remote_handler(request, **kwargs) if request.is_ajax() else None
+        if handler is None:
+            return self._dispatch_super(request, *args, **kwargs)
+        if isinstance(handler, HttpResponse):
+            return handler
+        try:
+            response = self.get_rmi_response(handler)
+        except JSONResponseException as e:
+            return self.json_response({'message': e.args[0]}, e.status_code)
+        return self.conditional_response(request, response)
+
+    def post(self, request, *args, **kwargs):
+        handler, in_data = self.get_remote_handler_and_data(request) if request.is_ajax() else (None, None)
+        if handler is None:
             return self._dispatch_super(request, *args, **kwargs)
+        if isinstance(handler, HttpResponse):
+            return handler
+        try:
+            return self.get_rmi_response(handler, in_data)
+        except JSONResponseException as e:
+            return self.json_response({'message': e.args[0]}, e.status_code)
+
+    def get_remote_handler(self, request, **kwargs):
+        """
+        Returns the method to invoke for a GET request, ``None`` if the request shall be handled
+        by the view itself, or a '403 Forbidden' response.
+        """
         if 'action' in kwargs:
             warnings.warn("Using the keyword 'action' in URLresolvers is deprecated. Please use 'invoke_method' instead", DeprecationWarning)
             remote_method = kwargs['action']
@@ -64,25 +301,16 @@ class JSONResponseMixin(JSONBaseMixin):
             remote_method = kwargs.get('invoke_method')
         if remote_method:
             # method for invocation is determined programmatically
-            handler = getattr(self, remote_method)
-        else:
-            # method for invocation is determined by HTTP header
-            remote_method = request.META.get('HTTP_DJNG_REMOTE_METHOD')
-            handler = remote_method and getattr(self, remote_method, None)
-            if not callable(handler):
-                return self._dispatch_super(request, *args, **kwargs)
-            if not hasattr(handler, 'allow_rmi'):
-                return HttpResponseForbidden("Method '{0}.{1}' has no decorator '@allow_remote_invocation'"
-                                             .format(self.__class__.__name__, remote_method))
-        try:
-            response_data = handler()
-        except JSONResponseException as e:
-            return self.json_response({'message': e.args[0]}, e.status_code)
-        return self.json_response(response_data)
+            return getattr(self, remote_method)
+        # method for invocation is determined by HTTP header
+        return self._get_allowed_handler(request.META.get('HTTP_DJNG_REMOTE_METHOD'))
 
-    def post(self, request, *args, **kwargs):
-        if not request.is_ajax():
-            return self._dispatch_super(request, *args, **kwargs)
+    def get_remote_handler_and_data(self, request):
+        """
+        Returns the method to invoke for a POST request, together with the decoded payload.
+        Instead of a method, ``None`` or a '403 Forbidden' response may be returned, as in
+        ``get_remote_handler()``.
+        """
         try:
             in_data = json.loads(request.body.decode('utf-8'))
         except ValueError:
@@ -92,22 +320,124 @@ class JSONResponseMixin(JSONBaseMixin):
             remote_method = in_data.pop('action')
         else:
             remote_method = request.META.get('HTTP_DJNG_REMOTE_METHOD')
-        handler = remote_method and getattr(self, remote_method, None)
-        if not callable(handler):
-            return self._dispatch_super(request, *args, **kwargs)
-        if not hasattr(handler, 'allow_rmi'):
+        return self._get_allowed_handler(remote_method), in_data
+
+    def _get_allowed_handler(self, remote_method):
+        try:
+            func = self.get_remote_methods()[remote_method][0]
+        except KeyError:
+            if not callable(remote_method and getattr(self, remote_method, None)):
+                return None
             return HttpResponseForbidden("Method '{0}.{1}' has no decorator '@allow_remote_invocation'"
-                                         .format(self.__class__.__name__, remote_method), 403)
+                                         .format(self.__class__.__name__, remote_method))
+        return func.__get__(self, self.__class__)
+
+    def _dispatch_super(self, request, *args, **kwargs):
+        base = super(JSONResponseMixin, self)
+        handler = getattr(base, request.method.lower(), None)
+        if callable(handler):
+            return handler(request, *args, **kwargs)
+        # HttpResponseNotAllowed expects permitted methods.
+        return HttpResponseBadRequest('This view can not handle method {0}'.format(request.method), status=405)
+
+
+def as_async_view(view):
+    """
+    Wrap a view function, returned by ``View.as_view()``, into a coroutine function, so that
+    Django's handlers await the coroutine returned by an asynchronous ``dispatch()`` method.
+    """
+    async def async_view(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if asyncio.iscoroutine(response):
+            response = await response
+        return response
+
+    return update_wrapper(async_view, view)
+
+
+async def await_handler(handler, *args, **kwargs):
+    """
+    Await the given handler if it is a coroutine function, otherwise run it in a thread.
+    """
+    if asyncio.iscoroutinefunction(handler):
+        return await handler(*args, **kwargs)
+    return await sync_to_async(handler)(*args, **kwargs)
+
+
+class AsyncJSONResponseMixin(JSONResponseMixin):
+    """
+    Counterpart of ``JSONResponseMixin`` for views running under ASGI. Methods decorated with
+    ``@allow_remote_invocation`` may be declared as ``async def``; they are awaited without
+    occupying a thread. Synchronous methods are run in a thread through ``sync_to_async``.
+    """
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return as_async_view(super(AsyncJSONResponseMixin, cls).as_view(**initkwargs))
+
+    async def get(self, request, *args, **kwargs):
+        handler = self.get_remote_handler(request, **kwargs) if request.is_ajax() else None
+        if handler is None:
+            return await self._dispatch_super(request, *args, **kwargs)
+        if isinstance(handler, HttpResponse):
+            return handler
         try:
-            response_data = handler(in_data)
+            response = await self.get_rmi_response_async(handler)
         except JSONResponseException as e:
             return self.json_response({'message': e.args[0]}, e.status_code)
-        return self.json_response(response_data)
+        return self.conditional_response(request, response)
 
-    def _dispatch_super(self, request, *args, **kwargs):
+    async def post(self, request, *args, **kwargs):
+        handler, in_data = self.get_remote_handler_and_data(request) if request.is_ajax() else (None, None)
+        if handler is None:
+            return await self._dispatch_super(request, *args, **kwargs)
+        if isinstance(handler, HttpResponse):
+            return handler
+        try:
+            return await self.get_rmi_response_async(handler, in_data)
+        except JSONResponseException as e:
+            return self.json_response({'message': e.args[0]}, e.status_code)
+
+    async def get_rmi_response_async(self, handler, *args):
+        if getattr(handler, 'rmi_cache', None) is None:
+            return self.json_response(await await_handler(handler, *args))
+        if asyncio.iscoroutinefunction(handler):
+            # invoke the handler within the event loop, but access the cache in a thread
+            cache = caches[handler.rmi_cache['cache_alias']]
+            cache_key = await sync_to_async(self.get_rmi_cache_key)(handler, *args)
+            content = await sync_to_async(cache.get)(cache_key)
+            if content is None:
+                content = self.get_json_backend().dumps(await handler(*args))
+                await sync_to_async(cache.set)(cache_key, content, handler.rmi_cache['timeout'])
+            return self.encoded_json_response(content)
+        return await sync_to_async(self.get_rmi_response)(handler, *args)
+
+    async def _dispatch_super(self, request, *args, **kwargs):
         base = super(JSONResponseMixin, self)
         handler = getattr(base, request.method.lower(), None)
         if callable(handler):
-            return handler(request, *args, **kwargs)
+            return await await_handler(handler, request, *args, **kwargs)
         # HttpResponseNotAllowed expects permitted methods.
         return HttpResponseBadRequest('This view can not handle method {0}'.format(request.method), status=405)
+
+
+class FormSchemaMixin(JSONBaseMixin):
+    """
+    A mixin for View classes that serves the schema of the form given by ``form_class``, as
+    returned by its method ``get_form_schema()``. Since this schema only changes after deploying,
+    the client may cache it for ``schema_max_age`` seconds and revalidate it using its ETag.
+    """
+    form_class = None
+    schema_max_age = 86400
+    use_etag = True
+
+    def get_schema_form(self):
+        """
+        Returns the unbound form instance to describe.
+        """
+        return self.form_class()
+
+    def get(self, request, *args, **kwargs):
+        response = self.json_response(self.get_schema_form().get_form_schema())
+        del response['Cache-Control']
+        patch_cache_control(response, max_age=self.schema_max_age)
+        return self.conditional_response(request, response)
@@ -1,25 +1,221 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import md5
+
+from django.core.cache import cache
 from django.core.exceptions import SuspiciousMultipartForm
 from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import UploadedFile
 from django.views.generic import View
 from django.http import JsonResponse
+from django.utils.http import urlencode
 
 from djng import app_settings
+from djng.core.uploads import get_upload_name, schedule_reaping, temp_name_signer
 from djng.forms.fields import FileField, ImageField
 
+_pending_previews = {}
+
+
+@lru_cache(maxsize=None)
+def get_preview_executor(max_workers):
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def get_preview_cache_key(temp_name):
+    return 'djng.upload.preview:' + md5(temp_name.encode('utf-8')).hexdigest()
+
+
+def generate_preview(field, temp_name, timeout):
+    """
+    Generate the preview of an uploaded file and keep it in the cache, until it is fetched by the
+    client. This function may run in another thread or process.
+    """
+    url = field.get_preview_url(temp_name)
+    cache.set(get_preview_cache_key(temp_name), url, timeout)
+    return url
+
 
 class FileUploadView(View):
     storage = app_settings.upload_storage
     thumbnail_size = app_settings.THUMBNAIL_OPTIONS
-    signer = signing.Signer()
+    signer = temp_name_signer
+    preview_workers = app_settings.PREVIEW_WORKERS
+    preview_timeout = 3600
+
+    def get_preview_executor(self):
+        """
+        Returns the executor generating the previews of uploaded images, or None to generate them
+        while processing the upload.
+        """
+        if self.preview_workers:
+            return get_preview_executor(self.preview_workers)
+
+    def get_field(self, filetype):
+        if filetype == 'file':
+            return FileField
+        if filetype == 'image':
+            return ImageField
+        raise SuspiciousMultipartForm("Missing attribute 'filetype' in form data.")
 
     def post(self, request, *args, **kwargs):
-        if request.POST.get('filetype') == 'file':
-            field = FileField
-        elif request.POST.get('filetype') == 'image':
-            field = ImageField
-        else:
-            raise SuspiciousMultipartForm("Missing attribute 'filetype' in form data.")
+        field = self.get_field(request.POST.get('filetype'))
+        executor = self.get_preview_executor() if issubclass(field, ImageField) else None
         data = {}
         for name, file_obj in request.FILES.items():
-            data[name] = field.preview(file_obj)
+            if executor is None:
+                data[name] = field.preview(file_obj)
+            else:
+                temp_name = field.save_upload(file_obj)
+                data[name] = self.describe_upload(request, field, temp_name, file_obj)
+        schedule_reaping()
         return JsonResponse(data)
+
+    def describe_upload(self, request, field, temp_name, file_obj):
+        """
+        Returns the description of a file saved into the temporary storage, including its preview.
+        """
+        data = field.get_upload_data(temp_name, file_obj)
+        executor = self.get_preview_executor() if issubclass(field, ImageField) else None
+        if executor is None:
+            data['url'] = field.get_preview_url(temp_name, file_obj.content_type)
+            return data
+        data['preview_url'] = '{0}?{1}'.format(request.path, urlencode({'temp_name': data['temp_name']}))
+        future = executor.submit(generate_preview, field, temp_name, self.preview_timeout)
+        _pending_previews[temp_name] = future
+        future.add_done_callback(lambda f: _pending_previews.pop(temp_name, None))
+        return data
+
+    def get(self, request, *args, **kwargs):
+        """
+        Returns the preview of an uploaded image, whose generation has been deferred. Responds with
+        status 202, while the preview still is being generated.
+        """
+        try:
+            temp_name = self.signer.unsign(request.GET['temp_name'], max_age=app_settings.UPLOAD_TEMP_MAX_AGE)
+        except (KeyError, signing.BadSignature):
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        url = cache.get(get_preview_cache_key(temp_name))
+        if url is None:
+            future = _pending_previews.get(temp_name)
+            if future is not None and not future.done():
+                return JsonResponse({'status': 'pending'}, status=202)
+            try:
+                # generated by another process, lost or failed
+                url = generate_preview(ImageField, temp_name, self.preview_timeout)
+            except Exception:
+                return JsonResponse({'message': "No preview available"}, status=404)
+        return JsonResponse({'url': url})
+
+
+class ChunkedFileUploadView(FileUploadView):
+    """
+    View to upload large files in chunks, so that an interrupted upload can be resumed.
+
+    * POST with ``action=init``, ``filetype``, ``file_name``, ``file_size``, ``content_type`` and
+      optionally ``charset`` returns an ``upload_id``.
+    * PUT with the query parameters ``upload_id`` and ``offset`` appends the request body to the
+      file. If the offset does not match the size already received, it responds with status 409.
+      Each response contains the ``offset`` to continue with.
+    * GET with the query parameter ``upload_id`` returns the ``offset`` to resume an upload.
+    * POST with ``action=finalize`` and ``upload_id`` returns the same description of the uploaded
+      file, as ``FileUploadView`` does.
+    """
+    max_upload_size = app_settings.MAX_UPLOAD_SIZE
+    upload_id_max_age = 86400
+    upload_id_salt = 'djng.views.upload.ChunkedFileUploadView'
+
+    def get(self, request, *args, **kwargs):
+        if 'upload_id' not in request.GET:
+            return super(ChunkedFileUploadView, self).get(request, *args, **kwargs)
+        try:
+            upload = self.load_upload_id(request.GET['upload_id'])
+        except signing.BadSignature:
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        offset = self.get_received_size(upload)
+        if offset is None:
+            return JsonResponse({'message': "Upload not found"}, status=404)
+        return JsonResponse({'offset': offset})
+
+    def post(self, request, *args, **kwargs):
+        if request.POST.get('action') == 'init':
+            return self.init_upload(request)
+        if request.POST.get('action') == 'finalize':
+            return self.finalize_upload(request)
+        return super(ChunkedFileUploadView, self).post(request, *args, **kwargs)
+
+    def put(self, request, *args, **kwargs):
+        try:
+            upload = self.load_upload_id(request.GET.get('upload_id', ''))
+            offset = int(request.GET['offset'])
+            length = int(request.META['CONTENT_LENGTH'])
+        except (KeyError, ValueError, signing.BadSignature):
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        current_offset = self.get_received_size(upload)
+        if current_offset is None:
+            return JsonResponse({'message': "Upload not found"}, status=404)
+        if offset != current_offset:
+            return JsonResponse({'offset': current_offset}, status=409)
+        if offset + length > upload['file_size']:
+            return JsonResponse({'message': "Chunk exceeds the declared file size"}, status=413)
+        with self.storage.open(upload['temp_name'], 'ab') as temp_file:
+            while length > 0:
+                chunk = request.read(min(length, 0x10000))
+                if not chunk:
+                    break
+                temp_file.write(chunk)
+                length -= len(chunk)
+        return JsonResponse({'offset': self.storage.size(upload['temp_name'])})
+
+    def init_upload(self, request):
+        field = self.get_field(request.POST.get('filetype'))
+        try:
+            file_size = int(request.POST['file_size'])
+            file_obj = UploadedFile(name=request.POST['file_name'], content_type=request.POST['content_type'],
+                                    size=file_size, charset=request.POST.get('charset') or None)
+        except (KeyError, ValueError):
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        if file_size < 0 or not file_obj.name:
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        if self.max_upload_size is not None and file_size > self.max_upload_size:
+            return JsonResponse({'message': "File exceeds the maximum size of {} bytes".format(self.max_upload_size)},
+                                status=413)
+        temp_name = self.storage.save(self.storage.get_available_name(get_upload_name(file_obj.name)), ContentFile(b''))
+        schedule_reaping()
+        upload_id = signing.dumps({
+            'filetype': request.POST['filetype'],
+            'temp_name': temp_name,
+            'file_name': file_obj.name,
+            'file_size': file_size,
+            'content_type': file_obj.content_type,
+            'charset': file_obj.charset,
+        }, salt=self.upload_id_salt, compress=True)
+        return JsonResponse({'upload_id': upload_id, 'offset': 0})
+
+    def finalize_upload(self, request):
+        try:
+            upload = self.load_upload_id(request.POST.get('upload_id', ''))
+        except signing.BadSignature:
+            return JsonResponse({'message': "Missing or bogus upstream data"}, status=400)
+        offset = self.get_received_size(upload)
+        if offset is None:
+            return JsonResponse({'message': "Upload not found"}, status=404)
+        if offset != upload['file_size']:
+            return JsonResponse({'offset': offset}, status=409)
+        file_obj = UploadedFile(name=upload['file_name'], content_type=upload['content_type'],
+                                size=upload['file_size'], charset=upload['charset'])
+        field = self.get_field(upload['filetype'])
+        return JsonResponse(self.describe_upload(request, field, upload['temp_name'], file_obj))
+
+    def load_upload_id(self, upload_id):
+        return signing.loads(upload_id, salt=self.upload_id_salt, max_age=self.upload_id_max_age)
+
+    def get_received_size(self, upload):
+        """
+        Returns the number of bytes received so far, or None if the temporary file has vanished.
+        """
+        try:
+            return self.storage.size(upload['temp_name'])
+        except OSError:
+            return None
@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 import datetime
+import uuid
+
 from django.db import models
 
 
@@ -20,3 +22,17 @@ class SimpleModel(models.Model):
 
 class M2MModel(models.Model):
     dummy_models = models.ManyToManyField(DummyModel2)
+
+
+class SerializerModel(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4)
+    price = models.DecimalField(max_digits=8, decimal_places=2)
+    duration = models.DurationField(null=True)
+    active = models.BooleanField(default=True)
+    created = models.DateField(null=True)
+    document = models.FileField(blank=True)
+    simple = models.ForeignKey(SimpleModel, null=True, on_delete=models.SET_NULL)
+    dummy_models = models.ManyToManyField(DummyModel2)
+
+    class Meta:
+        ordering = ['-price']
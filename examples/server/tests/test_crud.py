@@ -1,12 +1,20 @@
 # -*- coding: utf-8 -*-
+import datetime
 import json
+from decimal import Decimal
+from unittest import skipUnless
 
 from django.test import TestCase
 from django.test.client import RequestFactory
 
-from djng.views.crud import NgCRUDView
+from djng.views.crud import AsyncNgCRUDView, NgCRUDView
 from djng.views.mixins import JSONResponseMixin
-from server.models.testing import DummyModel, DummyModel2, SimpleModel, M2MModel
+from server.models.testing import DummyModel, DummyModel2, SimpleModel, M2MModel, SerializerModel
+
+try:
+    from asgiref.sync import async_to_sync, sync_to_async
+except ImportError:  # Django < 3.0
+    async_to_sync = sync_to_async = None
 
 
 class CRUDTestViewWithM2M(JSONResponseMixin, NgCRUDView):
@@ -48,6 +56,67 @@ class CRUDTestViewWithFewAllowedMethod(NgCRUDView):
     exclude_methods = ['GET']
 
 
+class CRUDTestViewWithOffsetPagination(NgCRUDView):
+    model = DummyModel
+    paginate_by = 2
+    max_paginate_by = 3
+
+
+class CRUDTestViewWithKeysetPagination(NgCRUDView):
+    model = DummyModel
+    paginate_by = 2
+    keyset_field = '-name'
+
+
+class CRUDTestViewWithNullableKeyset(NgCRUDView):
+    model = SerializerModel
+    paginate_by = 2
+    keyset_field = 'created'
+
+
+class CRUDTestViewWithStreaming(NgCRUDView):
+    model = DummyModel
+    stream_chunk_size = 2
+
+
+class CRUDTestViewWithValuesStreaming(NgCRUDView):
+    model = M2MModel
+    stream_chunk_size = 2
+    use_values_serializer = True
+
+
+class CRUDTestViewWithLastModified(NgCRUDView):
+    model = DummyModel
+    last_modified_field = 'timefield'
+
+
+class AsyncCRUDTestViewWithStreaming(AsyncNgCRUDView):
+    model = DummyModel2
+    stream_chunk_size = 2
+
+
+class CRUDTestViewWithCompression(CRUDTestViewWithLastModified):
+    compress_min_length = 0
+
+
+class CRUDTestViewWithBulk(NgCRUDView):
+    model = SimpleModel
+    allow_bulk = True
+
+
+class CRUDTestViewWithBulkQueries(CRUDTestViewWithBulk):
+    use_bulk_queries = True
+
+
+class AsyncCRUDTestView(AsyncNgCRUDView):
+    model = DummyModel2
+
+    async def ng_get(self, request, *args, **kwargs):
+        if request.GET['pk'] == '0':
+            raise self.model.DoesNotExist("No such object")
+        return await sync_to_async(super(AsyncCRUDTestView, self).ng_get)(request, *args, **kwargs)
+
+
 class CRUDViewTest(TestCase):
     names = ['John', 'Anne', 'Chris', 'Beatrice', 'Matt']
     emails = ["@".join((name, "example.com")) for name in names]
@@ -97,6 +166,125 @@ class CRUDViewTest(TestCase):
             db_obj = SimpleModel.objects.get(email=obj['email'])
             self.assertEqual(obj['name'], db_obj.name)
 
+    def test_ng_query_offset_pagination(self):
+        request = self.factory.get('/crud/')
+        response = CRUDTestViewWithOffsetPagination.as_view()(request)
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([obj['name'] for obj in data], self.names[:2])
+        self.assertEqual(response['DjNg-Next-Offset'], '2')
+
+        request = self.factory.get('/crud/?offset=2&limit=10')
+        response = CRUDTestViewWithOffsetPagination.as_view()(request)
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([obj['name'] for obj in data], self.names[2:5])
+        self.assertFalse(response.has_header('DjNg-Next-Offset'))
+
+        request = self.factory.get('/crud/?offset=foo')
+        response = CRUDTestViewWithOffsetPagination.as_view()(request)
+        self.assertEqual(response.status_code, 400)
+
+    def test_ng_query_keyset_pagination(self):
+        names, cursor = [], None
+        for _ in range(3):
+            url = '/crud/?cursor={0}'.format(cursor) if cursor else '/crud/'
+            response = CRUDTestViewWithKeysetPagination.as_view()(self.factory.get(url))
+            names.extend(obj['name'] for obj in json.loads(response.content.decode('utf-8')))
+            cursor = response.get('DjNg-Next-Cursor')
+        self.assertIsNone(cursor)
+        self.assertEqual(names, sorted(self.names, reverse=True))
+
+        response = CRUDTestViewWithKeysetPagination.as_view()(self.factory.get('/crud/?cursor=foo'))
+        self.assertEqual(response.status_code, 400)
+
+    def test_ng_query_keyset_pagination_after_deletion(self):
+        view = CRUDTestViewWithKeysetPagination.as_view(keyset_field='timefield')
+        response = view(self.factory.get('/crud/'))
+        names = [obj['name'] for obj in json.loads(response.content.decode('utf-8'))]
+        # the object referred by the cursor is deleted, before the next page is fetched
+        DummyModel.objects.filter(name=names[-1]).delete()
+        with self.assertNumQueries(1):
+            response = view(self.factory.get('/crud/?cursor={0}'.format(response['DjNg-Next-Cursor'])))
+        self.assertEqual(response.status_code, 200)
+        names.extend(obj['name'] for obj in json.loads(response.content.decode('utf-8')))
+        self.assertEqual(names, self.names[:4])
+
+    def test_ng_query_nullable_keyset_pagination(self):
+        dates = [datetime.date(2020, 1, 3), None, datetime.date(2020, 1, 1), None, datetime.date(2020, 1, 2)]
+        for created in dates:
+            SerializerModel.objects.create(price=Decimal('1.00'), created=created)
+        for descending in (False, True):
+            view = CRUDTestViewWithNullableKeyset.as_view(keyset_field='-created' if descending else 'created')
+            response = view(self.factory.get('/crud/'))
+            result = [obj['created'] for obj in json.loads(response.content.decode('utf-8'))]
+            while response.has_header('DjNg-Next-Cursor'):
+                response = view(self.factory.get('/crud/?cursor={0}'.format(response['DjNg-Next-Cursor'])))
+                self.assertEqual(response.status_code, 200)
+                result.extend(obj['created'] for obj in json.loads(response.content.decode('utf-8')))
+            expected = sorted((d.isoformat() for d in dates if d), reverse=descending) + [None, None]
+            self.assertEqual(result, expected)
+
+    def test_ng_query_streaming(self):
+        request = self.factory.get('/crud/')
+        response = CRUDTestViewWithStreaming.as_view()(request)
+        self.assertTrue(response.streaming)
+        data = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual([obj['name'] for obj in data], self.names)
+        self.assertEqual(data, json.loads(CRUDTestViewWithFK.as_view()(request).content.decode('utf-8')))
+
+        response = CRUDTestViewWithValuesStreaming.as_view()(request)
+        data = json.loads(b''.join(response.streaming_content).decode('utf-8'))
+        self.assertEqual(data, json.loads(CRUDTestViewWithM2M.as_view()(request).content.decode('utf-8')))
+
+        DummyModel.objects.all().delete()
+        response = CRUDTestViewWithStreaming.as_view()(request)
+        self.assertEqual(b''.join(response.streaming_content), b'[]')
+
+    def test_ng_query_conditional(self):
+        response = CRUDTestViewWithLastModified.as_view()(self.factory.get('/crud/'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(response.has_header('Last-Modified'))
+
+        request = self.factory.get('/crud/', HTTP_IF_NONE_MATCH=etag)
+        response = CRUDTestViewWithLastModified.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        DummyModel.objects.filter(pk=1).delete()
+        response = CRUDTestViewWithLastModified.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_ng_query_conditional_compressed(self):
+        response = CRUDTestViewWithCompression.as_view()(self.factory.get('/crud/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        request = self.factory.get('/crud/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=etag)
+        response = CRUDTestViewWithCompression.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        response = CRUDTestViewWithCompression.as_view()(self.factory.get('/crud/'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['ETag'], etag[2:])
+
+    def test_ng_get_conditional(self):
+        response = CRUDTestViewWithLastModified.as_view()(self.factory.get('/crud/?pk=1'))
+        etag = response['ETag']
+
+        request = self.factory.get('/crud/?pk=1', HTTP_IF_NONE_MATCH=etag)
+        response = CRUDTestViewWithLastModified.as_view()(request)
+        self.assertEqual(response.status_code, 304)
+
+        obj = DummyModel.objects.get(pk=1)
+        obj.timefield += datetime.timedelta(seconds=1)
+        obj.save()
+        response = CRUDTestViewWithLastModified.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+
     def test_ng_get(self):
         # CRUDTestViewWithFK
         request = self.factory.get('/crud/?pk=1')
@@ -206,6 +394,40 @@ class CRUDViewTest(TestCase):
         response5 = CRUDTestViewWithM2M.as_view()(request5)
         self.assertEqual(response5.status_code, 200)
 
+    def test_ng_bulk_save(self):
+        for view_class in (CRUDTestViewWithBulk, CRUDTestViewWithBulkQueries):
+            SimpleModel.objects.filter(email__startswith='new').delete()
+            items = [
+                {'name': 'Newbie', 'email': 'new@example.com'},
+                {'pk': 1, 'name': 'Johnny', 'email': 'John@example.com'},
+                {'name': 'Invalid', 'email': 'no email'},
+                {'pk': 100, 'name': 'Missing', 'email': 'missing@example.com'},
+                'foo',
+                {'pk': 'abc', 'name': 'Malformed', 'email': 'malformed@example.com'},
+                {'pk': '1', 'name': 'Duplicate', 'email': 'duplicate@example.com'},
+            ]
+            request = self.factory.post('/crud/', data=json.dumps(items), content_type='application/json')
+            response = view_class.as_view()(request)
+            self.assertEqual(response.status_code, 200)
+            data = json.loads(response.content.decode('utf-8'))
+            self.assertEqual([result['status'] for result in data], [201, 200, 400, 404, 400, 400, 400])
+            self.assertEqual(data[0]['data']['pk'], SimpleModel.objects.get(email='new@example.com').pk)
+            self.assertEqual(data[1]['data']['name'], 'Johnny')
+            self.assertEqual(SimpleModel.objects.get(pk=1).name, 'Johnny')
+            self.assertIn('email', data[2]['detail'])
+            self.assertFalse(SimpleModel.objects.filter(name__in=['Invalid', 'Missing', 'Malformed', 'Duplicate'])
+                             .exists())
+
+    def test_ng_bulk_delete(self):
+        request = self.factory.delete('/crud/?pk=2&pk=1&pk=100&pk=abc&pk=2')
+        response = CRUDTestViewWithBulk.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([result['status'] for result in data], [200, 200, 404, 400, 400])
+        self.assertEqual([result['data']['name'] for result in data[:2]], ['Anne', 'John'])
+        self.assertEqual(SimpleModel.objects.filter(pk__in=[1, 2]).count(), 0)
+        self.assertEqual(SimpleModel.objects.count(), len(self.names) - 2)
+
     def test_method_not_supported(self):
         # CRUDTestViewWithFewAllowedMethod
         request = self.factory.get('/crud/')
@@ -217,3 +439,37 @@ class CRUDViewTest(TestCase):
                                     content_type='application/json')
         response = CRUDTestViewWithFewAllowedMethod.as_view()(request)
         self.assertEqual(response.status_code, 200)
+
+    @skipUnless(async_to_sync, "asgiref is not installed")
+    def test_async_view(self):
+        view = AsyncCRUDTestView.as_view()
+        response = async_to_sync(view)(self.factory.get('/crud/'))
+        self.assertEqual([obj['name'] for obj in json.loads(response.content.decode('utf-8'))],
+                         ["Model2 name", "Mathilde"])
+
+        pk = DummyModel2.objects.get(name="Mathilde").pk
+        response = async_to_sync(view)(self.factory.get('/crud/?pk={0}'.format(pk)))
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['name'], "Mathilde")
+        response = async_to_sync(view)(self.factory.get('/crud/?pk=0'))
+        self.assertEqual(response.status_code, 404)
+
+        request = self.factory.post('/crud/', json.dumps({'name': "Albert"}), content_type='application/json')
+        response = async_to_sync(view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(DummyModel2.objects.filter(name="Albert").exists())
+
+        response = async_to_sync(view)(self.factory.put('/crud/'))
+        self.assertEqual(response.status_code, 405)
+
+    @skipUnless(async_to_sync, "asgiref is not installed")
+    def test_async_streaming(self):
+        view = AsyncCRUDTestViewWithStreaming.as_view()
+
+        async def get_content():
+            # the ASGI handler iterates the streaming content within the event loop
+            response = await view(self.factory.get('/crud/'))
+            return b''.join(response.streaming_content)
+
+        content = async_to_sync(get_content)()
+        self.assertEqual([obj['name'] for obj in json.loads(content.decode('utf-8'))],
+                         list(DummyModel2.objects.values_list('name', flat=True)))
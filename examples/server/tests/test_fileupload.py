@@ -1,20 +1,33 @@
 # -*- coding: utf-8 -*-
 from __future__ import unicode_literals
 
-import os, json
+import gc, io, os, json, shutil, tempfile, time
+from unittest import mock
 
 from django.conf import settings
 from django.urls import reverse
 from django.core import signing
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.db.models.fields.files import FieldFile
+from django.db.models import ImageField as ImageModelField
+from django.core.cache import cache
+from django.core.files.storage import FileSystemStorage
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 from django.test import override_settings, TestCase
-from django.test.client import Client
+from django.test.client import Client, RequestFactory
+from django.utils.http import urlencode
 
 from pyquery.pyquery import PyQuery
 
 from djng import app_settings
+from djng.core.uploads import get_upload_name, reap_expired_uploads, temp_name_signer
 from djng.forms import NgModelFormMixin, NgForm
 from djng.forms.fields import ImageField
+from djng.forms.widgets import (get_file_icon_url, get_static_url, get_thumbnail_cache_key,
+                                prefetch_thumbnail_urls)
+from djng.views import upload
 
 
 class TestUploadForm(NgModelFormMixin, NgForm):
@@ -25,15 +38,34 @@ class TestUploadForm(NgModelFormMixin, NgForm):
 
 
 
+class DeferredPreviewUploadView(upload.FileUploadView):
+    preview_workers = 1
+
+
+class LabeledImageField(ImageField):
+    @classmethod
+    def preview(cls, file_obj):
+        data = super(LabeledImageField, cls).preview(file_obj)
+        data['label'] = "Uploaded image"
+        return data
+
+
+class LabeledUploadView(upload.FileUploadView):
+    def get_field(self, filetype):
+        return LabeledImageField
+
+
+class ChunkedUploadView(upload.ChunkedFileUploadView):
+    max_upload_size = 1000000
+
+
 class FileUploadTest(TestCase):
-    signer = signing.Signer()
+    signer = temp_name_signer
     storage = app_settings.upload_storage
+    temp_name_pattern = r'^\d{10}/[0-9a-f]{2}/sample-image\.jpg$'
 
     def tearDown(self):
-        try:
-            os.remove(os.path.join(settings.MEDIA_ROOT, 'upload_temp/sample-image.jpg'))
-        except:
-            pass
+        shutil.rmtree(os.path.join(settings.MEDIA_ROOT, 'upload_temp'), ignore_errors=True)
 
     def upload_image(self):
         client = Client()
@@ -50,7 +82,16 @@ class FileUploadTest(TestCase):
         self.assertTrue(content['file:0']['url'].startswith('url(data:application/octet-stream;base64,/9j/4AAQSkZJRgABA'))
         self.assertEqual(content['file:0']['file_name'], 'sample-image.jpg')
         self.assertEqual(content['file:0']['content_type'], 'image/jpeg')
-        self.assertEqual(self.signer.unsign(content['file:0']['temp_name']), 'sample-image.jpg')
+        self.assertRegex(self.signer.unsign(content['file:0']['temp_name']), self.temp_name_pattern)
+
+    def test_custom_preview(self):
+        factory = RequestFactory()
+        with open(os.path.join(os.path.dirname(__file__), 'sample-image.jpg'), 'rb') as fp:
+            request = factory.post('/upload/', {'file:0': fp, 'filetype': 'image'})
+            response = LabeledUploadView.as_view()(request)
+        content = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(content['file:0']['label'], "Uploaded image")
+        self.assertTrue(content['file:0']['url'].startswith('url(data:'))
 
     def test_render_widget(self):
         form = TestUploadForm()
@@ -85,8 +126,219 @@ class FileUploadTest(TestCase):
     def test_receive_large_image(self):
         content = self.upload_image()
         content['file:0'].pop('url')
+        temp_name = self.signer.unsign(content['file:0']['temp_name'])
         data = {'avatar': content['file:0']}
         form = TestUploadForm(data=data)
         self.assertTrue(form.is_valid())
         self.assertIsInstance(form.cleaned_data['avatar'], TemporaryUploadedFile)
         self.assertEqual(form.cleaned_data['avatar'].name, "sample-image.jpg")
+
+        # the file is moved from the temporary storage into its final location
+        avatar = form.cleaned_data['avatar']
+        self.assertEqual(avatar.temporary_file_path(), self.storage.path(temp_name))
+        self.assertEqual(avatar.size, os.path.getsize(avatar.temporary_file_path()))
+        target_dir = tempfile.mkdtemp()
+        try:
+            stored_name = FileSystemStorage(location=target_dir).save('avatar.jpg', avatar)
+            self.assertFalse(self.storage.exists(temp_name))
+            self.assertEqual(os.path.getsize(os.path.join(target_dir, stored_name)), avatar.size)
+        finally:
+            avatar.close()
+            shutil.rmtree(target_dir)
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=50000)
+    def test_receive_large_image_into_other_storage(self):
+        content = self.upload_image()
+        content['file:0'].pop('url')
+        temp_name = self.signer.unsign(content['file:0']['temp_name'])
+        form = TestUploadForm(data={'avatar': content['file:0']})
+        self.assertTrue(form.is_valid())
+
+        # storages not offering local paths, such as S3, read the content of the file
+        avatar = form.cleaned_data['avatar']
+        self.assertEqual(len(avatar.read()), avatar.size)
+        self.assertTrue(self.storage.exists(temp_name))
+        avatar.close()
+        self.assertFalse(self.storage.exists(temp_name))
+
+        content = self.upload_image()
+        content['file:0'].pop('url')
+        temp_name = self.signer.unsign(content['file:0']['temp_name'])
+        form = TestUploadForm(data={'avatar': content['file:0']})
+        self.assertTrue(form.is_valid())
+        self.assertTrue(self.storage.exists(temp_name))
+        del form
+        gc.collect()
+        self.assertFalse(self.storage.exists(temp_name))
+
+    def test_deferred_preview(self):
+        factory = RequestFactory()
+        upload_filename = os.path.join(os.path.dirname(__file__), 'sample-image.jpg')
+        with open(upload_filename, 'rb') as fp:
+            request = factory.post('/upload/', {'file:0': fp, 'filetype': 'image'})
+            response = DeferredPreviewUploadView.as_view()(request)
+        self.assertEqual(response.status_code, 200)
+        content = json.loads(response.content.decode('utf-8'))['file:0']
+        self.assertNotIn('url', content)
+        temp_name = self.signer.unsign(content['temp_name'])
+        self.assertRegex(temp_name, self.temp_name_pattern)
+        self.assertEqual(content['preview_url'], '/upload/?' + urlencode({'temp_name': content['temp_name']}))
+
+        future = upload._pending_previews.get(temp_name)
+        if future:
+            future.result()
+        response = DeferredPreviewUploadView.as_view()(factory.get(content['preview_url']))
+        self.assertEqual(response.status_code, 200)
+        url = json.loads(response.content.decode('utf-8'))['url']
+        self.assertTrue(url.startswith('url(data:application/octet-stream;base64,/9j/4AAQSkZJRgABA'))
+
+    def test_fetch_preview(self):
+        content = self.upload_image()
+        response = Client().get(reverse('fileupload'), {'temp_name': content['file:0']['temp_name']})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8'))['url'], content['file:0']['url'])
+        response = Client().get(reverse('fileupload'), {'temp_name': 'sample-image.jpg:bogus'})
+        self.assertEqual(response.status_code, 400)
+        response = Client().get(reverse('fileupload'), {'temp_name': self.signer.sign('missing.jpg')})
+        self.assertEqual(response.status_code, 404)
+
+    def test_chunked_upload(self):
+        factory = RequestFactory()
+        view = ChunkedUploadView.as_view()
+        with open(os.path.join(os.path.dirname(__file__), 'sample-image.jpg'), 'rb') as fp:
+            payload = fp.read()
+        init_data = {'action': 'init', 'filetype': 'image', 'file_name': 'sample-image.jpg',
+                     'file_size': len(payload), 'content_type': 'image/jpeg'}
+        response = view(factory.post('/upload/', dict(init_data, file_size=2000000)))
+        self.assertEqual(response.status_code, 413)
+        response = view(factory.post('/upload/', init_data))
+        self.assertEqual(response.status_code, 200)
+        upload_id = json.loads(response.content.decode('utf-8'))['upload_id']
+
+        def put(offset, chunk):
+            request = factory.put('/upload/?upload_id={0}&offset={1}'.format(upload_id, offset), chunk,
+                                  content_type='application/octet-stream')
+            response = view(request)
+            return response.status_code, json.loads(response.content.decode('utf-8'))
+
+        self.assertEqual(put(0, payload[:10000]), (200, {'offset': 10000}))
+        # resend a chunk, as after a dropped connection
+        self.assertEqual(put(0, payload[:10000]), (409, {'offset': 10000}))
+        response = view(factory.get('/upload/', {'upload_id': upload_id}))
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'offset': 10000})
+        self.assertEqual(put(10000, payload[10000:] + b'trailing')[0], 413)
+        response = view(factory.post('/upload/', {'action': 'finalize', 'upload_id': upload_id}))
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(put(10000, payload[10000:]), (200, {'offset': len(payload)}))
+
+        response = view(factory.post('/upload/', {'action': 'finalize', 'upload_id': upload_id}))
+        self.assertEqual(response.status_code, 200)
+        content = json.loads(response.content.decode('utf-8'))
+        self.assertRegex(self.signer.unsign(content['temp_name']), self.temp_name_pattern)
+        self.assertEqual(content['file_size'], len(payload))
+        self.assertTrue(content['url'].startswith('url(data:application/octet-stream;base64,/9j/4AAQSkZJRgABA'))
+        content.pop('url')
+        form = TestUploadForm(data={'avatar': content})
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['avatar'].read(), payload)
+
+    def test_chunked_upload_bogus_id(self):
+        response = ChunkedUploadView.as_view()(RequestFactory().post('/upload/', {
+            'action': 'finalize', 'upload_id': self.signer.sign('sample-image.jpg')}))
+        self.assertEqual(response.status_code, 400)
+
+    def test_expired_upload(self):
+        content = self.upload_image()['file:0']
+        content.pop('url')
+        with override_settings(DJNG_UPLOAD_TEMP_MAX_AGE=-1):
+            form = TestUploadForm(data={'avatar': content})
+            self.assertFalse(form.is_valid())
+        self.assertEqual(form.errors['avatar'], ["Uploaded file has expired"])
+
+    def test_reap_expired_uploads(self):
+        now = time.time()
+        expired_name = self.storage.save(get_upload_name('expired.txt', now - 7200), ContentFile(b'x'))
+        unsharded_name = self.storage.save('unsharded.txt', ContentFile(b'x'))
+        appended_name = self.storage.save(get_upload_name('appended.txt', now - 7200), ContentFile(b'x'))
+        recent_name = self.storage.save(get_upload_name('recent.txt', now), ContentFile(b'x'))
+        for name in (expired_name, unsharded_name):
+            os.utime(self.storage.path(name), (now - 7200, now - 7200))
+        self.assertEqual(reap_expired_uploads(max_age=3600), 2)
+        self.assertFalse(self.storage.exists(expired_name))
+        self.assertFalse(self.storage.exists(os.path.dirname(expired_name)))
+        self.assertFalse(self.storage.exists(unsharded_name))
+        self.assertTrue(self.storage.exists(appended_name))
+        self.assertTrue(self.storage.exists(recent_name))
+
+        os.utime(self.storage.path(appended_name), (now - 5400, now - 5400))
+        stdout = io.StringIO()
+        call_command('djng_reap_uploads', max_age=3600, stdout=stdout)
+        self.assertEqual(stdout.getvalue(), "Deleted 1 expired uploaded files.\n")
+        self.assertFalse(self.storage.exists(appended_name))
+        self.assertTrue(self.storage.exists(recent_name))
+
+    def test_reap_concurrently(self):
+        now = time.time()
+        expired_name = self.storage.save(get_upload_name('expired.txt', now - 7200), ContentFile(b'x'))
+        os.utime(self.storage.path(expired_name), (now - 7200, now - 7200))
+        listdir = self.storage.listdir
+
+        def listdir_removed(path):
+            # another process has reaped this folder meanwhile
+            if path:
+                shutil.rmtree(self.storage.path(path), ignore_errors=True)
+            return listdir(path)
+
+        with mock.patch.object(self.storage, 'listdir', side_effect=listdir_removed):
+            self.assertEqual(reap_expired_uploads(self.storage, max_age=3600), 0)
+        self.assertFalse(self.storage.exists(expired_name))
+
+
+class ThumbnailCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.override = override_settings(MEDIA_ROOT=self.media_root)
+        self.override.enable()
+        with open(os.path.join(os.path.dirname(__file__), 'sample-image.jpg'), 'rb') as fp:
+            self.image_names = [default_storage.save('image-{}.jpg'.format(k), fp) for k in range(3)]
+        field = ImageModelField()
+        self.images = [FieldFile(None, field, name) for name in self.image_names]
+
+    def tearDown(self):
+        self.override.disable()
+        shutil.rmtree(self.media_root)
+
+    def get_background_image(self, form):
+        return PyQuery(form.as_p())('div.drop-box textarea').attr('style')
+
+    def test_cached_thumbnail_url(self):
+        form = TestUploadForm(initial={'avatar': self.images[0]})
+        background_image = self.get_background_image(form)
+        self.assertIn('image-0.jpg.200x200', background_image)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_background_image(TestUploadForm(initial={'avatar': self.images[0]})),
+                             background_image)
+
+        cache_key = get_thumbnail_cache_key(self.image_names[0])
+        self.assertIsNotNone(cache.get(cache_key))
+        TestUploadForm.base_fields['avatar'].remove_current(self.image_names[0])
+        self.assertFalse(default_storage.exists(self.image_names[0]))
+        self.assertIsNone(cache.get(cache_key))
+
+    def test_prefetch_thumbnail_urls(self):
+        forms = [TestUploadForm(initial={'avatar': image}) for image in self.images]
+        prefetch_thumbnail_urls(forms)
+        forms = [TestUploadForm(initial={'avatar': image}) for image in self.images]
+        with self.assertNumQueries(0):
+            prefetch_thumbnail_urls(forms)
+            for k, form in enumerate(forms):
+                self.assertIn('image-{}.jpg.200x200'.format(k), self.get_background_image(form))
+
+    def test_file_icon_url(self):
+        self.assertEqual(get_file_icon_url('application/pdf'), '/static/djng/icons/pdf.png')
+        self.assertEqual(get_file_icon_url('bogus/type'), '/static/djng/icons/_blank.png')
+        cache_size = get_static_url.cache_info().currsize
+        for k in range(100):
+            get_file_icon_url('bogus/type-{}'.format(k))
+        self.assertEqual(get_static_url.cache_info().currsize, cache_size)
@@ -1,11 +1,17 @@
 # -*- coding: utf-8 -*-
 import copy
+import json
+from unittest import mock
+from django.core.cache import cache
 from django.db import models
 from django.forms import forms, widgets
 from django.http import QueryDict
-from django.test import TestCase
+from django.test import RequestFactory, TestCase
+from django.views.generic import View
 import six
+from djng.forms.angular_base import NgWidgetMixin, _get_render_generation_key
 from djng.forms import fields, NgModelFormMixin, NgForm, NgModelForm, NgDeclarativeFieldsMetaclass, NgFormValidationMixin
+from djng.views.mixins import FormSchemaMixin
 from pyquery.pyquery import PyQuery
 import unittest
 from lxml import html
@@ -120,6 +126,16 @@ class NgModelFormMixinTest(TestCase):
         mro_form.as_p()
         mro_form.as_p()
 
+    def test_widget_class_reused(self):
+        # widgets mixed with NgWidgetMixin share their class across form instances
+        first_form, second_form = DummyForm(), DummyForm()
+        first_form.as_p()
+        second_form.as_p()
+        for name in ('email', 'sex', 'check_multi', 'hide_me'):
+            widget_class = first_form.fields[name].widget.__class__
+            self.assertIs(widget_class, second_form.fields[name].widget.__class__)
+            self.assertEqual(widget_class.__mro__.count(NgWidgetMixin), 1)
+
     def test_form_with_custom_args(self):
         form_post_data = {'field1': 'value1', 'field2': 'value2'}
 
@@ -246,6 +262,21 @@ class NgModelFormMixinTest(TestCase):
         self.assertTrue(bound_form.errors.pop('sub1.radio_choices'))
         self.assertFalse(bound_form.errors)
 
+    def test_hidden_field_errors(self):
+        in_data = copy.deepcopy(self.valid_data)
+        in_data['hide_me'] = ''
+        bound_form = DummyForm(data=in_data)
+        self.assertIs(bound_form['email'], bound_form['email'])
+        with mock.patch.object(DummyForm, 'get_field_errors', autospec=True,
+                               side_effect=NgModelFormMixin.get_field_errors) as get_field_errors:
+            htmlsource = bound_form.as_p()
+            self.assertEqual(bound_form.as_p(), htmlsource)
+            self.assertEqual(get_field_errors.call_count, len(bound_form.fields))
+            bound_form.full_clean()
+            bound_form.non_field_errors()
+            self.assertEqual(get_field_errors.call_count, len(bound_form.fields) + 1)
+        self.assertEqual(htmlsource.count('(Hidden field hide_me) This field is required.'), 1)
+
     def test_initial_data(self):
         initial_data = self.unbound_form.get_initial_data()
         initial_keys = list(initial_data.keys())
@@ -260,6 +291,91 @@ class NgModelFormMixinTest(TestCase):
         self.assertEqual(initial_keys, valid_keys)
 
 
+class CachedDummyForm(DummyForm):
+    use_render_cache = True
+
+
+class CachedSubForm(SubForm1):
+    use_render_cache = True
+
+
+class RenderCacheTest(TestCase):
+    def tearDown(self):
+        CachedDummyForm.clear_render_cache()
+
+    def test_unbound_form(self):
+        html = CachedDummyForm().as_p()
+        self.assertEqual(html, DummyForm(form_name=CachedDummyForm().form_name).as_p())
+        with mock.patch.object(forms.BaseForm, '_html_output') as html_output:
+            self.assertIs(CachedDummyForm().as_p(), html)
+        html_output.assert_not_called()
+        self.assertNotEqual(CachedDummyForm().as_ul(), html)
+        self.assertNotEqual(CachedDummyForm(form_name='other_form').as_p(), html)
+
+        CachedDummyForm.clear_render_cache()
+        self.assertIsNot(CachedDummyForm().as_p(), html)
+
+    def test_cleared_by_other_process(self):
+        html = CachedDummyForm().as_p()
+        self.assertIs(CachedDummyForm().as_p(), html)
+        # another process clears the render cache of a base class
+        cache.set(_get_render_generation_key(DummyForm), 'other')
+        html = CachedDummyForm().as_p()
+        self.assertIs(CachedDummyForm().as_p(), html)
+        # the generations have been evicted from the cache
+        cache.clear()
+        self.assertIsNot(CachedDummyForm().as_p(), html)
+
+    def test_not_cached(self):
+        html = CachedDummyForm().as_p()
+        form = CachedDummyForm(initial={'email': 'john@example.com'})
+        self.assertIsNone(form.get_render_cache_key())
+        self.assertIn('john@example.com', form.as_p())
+        form = CachedDummyForm(data={'email': 'john@example.com'})
+        self.assertIsNone(form.get_render_cache_key())
+        self.assertIsNot(form.as_p(), html)
+
+    def test_model_instance_not_cached(self):
+        self.assertIsNotNone(CachedSubForm().get_render_cache_key())
+        form = CachedSubForm(instance=SubModel(first_name='John'))
+        self.assertIsNone(form.get_render_cache_key())
+        self.assertIn('John', form.as_p())
+        self.assertNotIn('John', CachedSubForm().as_p())
+
+
+class DummyFormSchemaView(FormSchemaMixin, View):
+    form_class = DummyForm
+
+
+class FormSchemaTest(TestCase):
+    def test_form_schema(self):
+        schema = DummyForm().get_form_schema()
+        self.assertEqual(schema['form_name'], 'RHVtbXlGb3Jt')
+        self.assertEqual(schema['scope_prefix'], 'dataroot')
+        self.assertEqual(schema['initial']['onoff'], False)
+        fields_schema = {field['name']: field for field in schema['fields']}
+        self.assertEqual(list(fields_schema), list(DummyForm.base_fields))
+        self.assertEqual(fields_schema['email']['label'], 'E-Mail')
+        self.assertEqual(fields_schema['email']['input_type'], 'email')
+        self.assertEqual(fields_schema['email']['attrs']['ng-model'], "dataroot['email']")
+        self.assertEqual(fields_schema['sex']['widget'], 'RadioSelect')
+        self.assertEqual(fields_schema['sex']['choices'], [{'value': 'm', 'label': 'Male'}, {'value': 'f', 'label': 'Female'}])
+        self.assertTrue(fields_schema['hide_me']['is_hidden'])
+        self.assertNotIn('choices', fields_schema['hide_me'])
+
+    def test_form_schema_view(self):
+        factory = RequestFactory()
+        response = DummyFormSchemaView.as_view()(factory.get('/schema.json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Cache-Control'], 'max-age=86400')
+        schema = json.loads(response.content.decode('utf-8'))
+        self.assertEqual(schema, json.loads(json.dumps(DummyForm().get_form_schema())))
+
+        response = DummyFormSchemaView.as_view()(factory.get('/schema.json', HTTP_IF_NONE_MATCH=response['ETag']))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['Cache-Control'], 'max-age=86400')
+
+
 class InvalidNgModelFormMixinTest(TestCase):
     def test_invalid_form(self):
         # create a form with an invalid Meta class
@@ -191,3 +191,35 @@ class TestUrlResolverView(TestCase):
         self.assertEqual(request.path, reverse('home'))
         self.assertEqual(request.path_info, reverse('home'))
         self.assertEqual(request.get_full_path(), reverse('home'))
+
+    def test_multiple_values_kept(self):
+        """GET parameters with multiple values should be kept in their order"""
+        data = {
+            self.url_name_arg: 'home',
+            'tag': ['a', 'b'],
+        }
+        request = self.factory.get(AngularUrlMiddleware.ANGULAR_REVERSE, data=data)
+        self.middleware.process_request(request)
+        self.assertEqual(request.GET.getlist('tag'), ['a', 'b'])
+        self.assertEqual(request.get_full_path(), reverse('home') + '?tag=a&tag=b')
+
+    def test_reverse_cache(self):
+        data = {
+            self.url_name_arg: 'home_kwargs',
+            self.kwarg_prefix + 'id': 1,
+            self.kwarg_prefix + 'id2': 2,
+            self.kwarg_prefix + 'id3': 3
+        }
+        for _ in range(2):
+            request = self.factory.get(AngularUrlMiddleware.ANGULAR_REVERSE, data=data)
+            self.middleware.process_request(request)
+            self.assertEqual(request.path, '/1/2/3')
+        cache_info = self.middleware.reverse_url.cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (1, 1))
+
+        with override_settings(DJNG_REVERSE_CACHE_SIZE=0):
+            middleware = AngularUrlMiddleware()
+        self.assertFalse(hasattr(middleware.reverse_url, 'cache_info'))
+        request = self.factory.get(AngularUrlMiddleware.ANGULAR_REVERSE, data=data)
+        middleware.process_request(request)
+        self.assertEqual(request.path, '/1/2/3')
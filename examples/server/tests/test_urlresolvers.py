@@ -1,9 +1,16 @@
 # -*- coding: utf-8 -*-
+import json
+import os
+import tempfile
+from io import StringIO
 
+from django.core.management import call_command
+from django.template import Context, Template
 from django.test import override_settings, TestCase
 from django.test.client import RequestFactory
+from django.utils import translation
 
-from djng.core.urlresolvers import get_all_remote_methods, get_current_remote_methods
+from djng.core.urlresolvers import get_all_remote_methods, get_current_remote_methods, get_url_patterns
 
 from .urls import RemoteMethodsView
 
@@ -37,3 +44,71 @@ class TemplateRemoteMethods(TestCase):
             },
         }
         self.assertDictEqual(remote_methods, expected)
+
+    def test_get_all_remote_methods_cached(self):
+        remote_methods = get_all_remote_methods()
+        self.assertIs(get_all_remote_methods(), remote_methods)
+
+        with override_settings(ROOT_URLCONF='server.urls'):
+            self.assertNotIn('submethods', get_all_remote_methods())
+        self.assertIn('submethods', get_all_remote_methods())
+
+    @override_settings(ROOT_URLCONF='server.tests.urls_i18n')
+    def test_get_all_remote_methods_per_language(self):
+        with translation.override('en'):
+            remote_methods = get_all_remote_methods()
+            self.assertEqual(remote_methods['urlresolvertags']['blah']['url'], '/en/url_resolvers/')
+            self.assertIs(get_all_remote_methods(), remote_methods)
+        with translation.override('de'):
+            remote_methods = get_all_remote_methods()
+            self.assertEqual(remote_methods['urlresolvertags']['blah']['url'], '/de/url_resolvers/')
+            self.assertEqual(remote_methods['submethods']['app']['foo']['url'], '/de/sub_methods/sub/app/')
+
+    def test_compile_rmi(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('djng_compile_rmi', output_dir=output_dir, stdout=StringIO())
+            with open(os.path.join(output_dir, 'djng', 'rmi-config.js')) as fh:
+                content = fh.read()
+        configuration = content[content.index('configure(') + 10:content.rindex(');\n}]);')]
+        self.assertDictEqual(json.loads(configuration), get_all_remote_methods())
+        rendered = Template("{% load djng_tags %}{% djng_rmi_script %}").render(Context())
+        self.assertEqual(rendered, '<script src="/static/djng/rmi-config.js"></script>')
+
+    @override_settings(ROOT_URLCONF='server.tests.urls_i18n', LANGUAGES=[('en', 'English'), ('de', 'German')])
+    def test_compile_rmi_per_language(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            call_command('djng_compile_rmi', output_dir=output_dir, stdout=StringIO())
+            self.assertFalse(os.path.exists(os.path.join(output_dir, 'djng', 'rmi-config.js')))
+            with open(os.path.join(output_dir, 'djng', 'rmi-config.de.js')) as fh:
+                content = fh.read()
+            self.assertTrue(os.path.exists(os.path.join(output_dir, 'djng', 'rmi-config.en.js')))
+        configuration = json.loads(content[content.index('configure(') + 10:content.rindex(');\n}]);')])
+        self.assertEqual(configuration['urlresolvertags']['blah']['url'], '/de/url_resolvers/')
+        with translation.override('de'):
+            rendered = Template("{% load djng_tags %}{% djng_rmi_script %}").render(Context())
+        self.assertEqual(rendered, '<script src="/static/djng/rmi-config.de.js"></script>')
+
+    def test_get_url_patterns(self):
+        url_patterns = get_url_patterns()
+        self.assertEqual(url_patterns['straightmethods'], [['/straight_methods/', []]])
+        self.assertEqual(url_patterns['submethods:app'], [['/sub_methods/sub/app/', []]])
+        self.assertIs(url_patterns['sub:app'], url_patterns['submethods:app'])
+        self.assertEqual(url_patterns['article'], [
+            ['/articles/%(year)s/%(slug)s/', ['year', 'slug'],
+             r'^/articles/(?<year>\d{4})/(?<slug>[\w-]+)/$'],
+            ['/articles/%(pk)s/', ['pk'], r'^/articles/(?<pk>\d+)/$'],
+        ])
+        self.assertIs(get_url_patterns(), url_patterns)
+        rendered = Template("{% load djng_tags %}{% djng_url_patterns %}").render(Context())
+        self.assertDictEqual(json.loads(rendered), url_patterns)
+
+    @override_settings(ROOT_URLCONF='server.tests.urls_i18n')
+    def test_get_url_patterns_per_language(self):
+        with translation.override('en'):
+            url_patterns = get_url_patterns()
+            self.assertEqual(url_patterns['urlresolvertags'], [['/en/url_resolvers/', []]])
+            self.assertIs(get_url_patterns(), url_patterns)
+        with translation.override('de'):
+            url_patterns = get_url_patterns()
+            self.assertEqual(url_patterns['urlresolvertags'], [['/de/url_resolvers/', []]])
+            self.assertEqual(url_patterns['submethods:app'], [['/de/sub_methods/sub/app/', []]])
@@ -1,10 +1,12 @@
 # -*- coding: utf-8 -*-
 import unittest
+from unittest import mock
 from bs4 import BeautifulSoup
 
 from django import VERSION as DJANGO_VERSION
 from django.forms import widgets
 from django.test import TestCase
+from django.utils import translation
 
 from djng.forms import fields, NgFormValidationMixin, NgForm
 
@@ -174,3 +176,42 @@ class NgFormValidationMixinTestCase(TestCase):
         self.assertEqual(label.input.attrs['value'], "c")
         self.assertEqual(label.input.attrs['ng-model'], "check_multi['c']")
         self.assertIn('checked', label.input.attrs)
+
+
+class PotentialErrorsCacheTestCase(TestCase):
+
+    def test_shared_by_form_instances(self):
+        first_form, second_form = EmailForm(), EmailForm()
+        first_form.as_p()
+        with mock.patch.object(fields.EmailField, 'get_potential_errors') as get_potential_errors:
+            html = second_form.as_p()
+        get_potential_errors.assert_not_called()
+        soup = BeautifulSoup(html, 'lxml')
+        self.assertEqual(soup.input.attrs['ng-required'], "true")
+        self.assertIn('email-pattern', soup.input.attrs)
+        self.assertIn("This field is required.", html)
+
+    def test_language_and_modified_field(self):
+        EmailForm().as_p()
+        with translation.override('de'):
+            html = EmailForm().as_p()
+        self.assertIn("Dieses Feld ist zwingend erforderlich.", html)
+        self.assertNotIn("This field is required.", html)
+
+        form = EmailForm()
+        form.fields['email'].required = False
+        form.fields['email'].error_messages['invalid'] = "Not an email address."
+        html = form.as_p()
+        self.assertNotIn("This field is required.", html)
+        self.assertIn("Not an email address.", html)
+        self.assertIn("This field is required.", EmailForm().as_p())
+
+    def test_form_schema(self):
+        schema = EmailForm().get_form_schema()
+        field_schema = schema['fields'][0]
+        self.assertEqual(field_schema['attrs']['ng-required'], 'true')
+        self.assertIn('email-pattern', field_schema['attrs'])
+        self.assertEqual(field_schema['potential_errors'], [
+            {'key': '$error.required', 'message': "This field is required."},
+            {'key': '$error.email', 'message': "Enter a valid email address."},
+        ])
@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+import datetime
+import json
+from decimal import Decimal
+
+from django.test import TestCase
+from django.test.client import RequestFactory
+
+from djng.views.crud import NgCRUDView
+from server.models.testing import DummyModel, DummyModel2, SimpleModel, M2MModel, SerializerModel
+
+
+class ValuesSerializerTest(TestCase):
+    """
+    Check that NgCRUDView.serialize_values() returns exactly the same output as the 'python'
+    serializer used by NgCRUDView.serialize_queryset().
+    """
+    def setUp(self):
+        self.factory = RequestFactory()
+        model2 = DummyModel2.objects.create(name="Model2 name")
+        other_model2 = DummyModel2.objects.create(name="Other name")
+        for name in ['John', 'Anne', 'Chris']:
+            DummyModel.objects.create(name=name, model2=model2)
+        simple = SimpleModel.objects.create(name='John', email='john@example.com')
+        M2MModel.objects.create().dummy_models.add(model2, other_model2)
+        M2MModel.objects.create()
+        first = SerializerModel.objects.create(price=Decimal('9.95'), duration=datetime.timedelta(hours=2),
+                                               created=datetime.date(2020, 2, 29), document='docs/a.pdf',
+                                               simple=simple)
+        first.dummy_models.add(other_model2)
+        SerializerModel.objects.create(price=Decimal('19.50'), active=False)
+
+    def assertSerializedEqual(self, model, fields=None, queryset=None):
+        view = NgCRUDView(model=model, fields=fields)
+        if queryset is None:
+            queryset = model.objects.all()
+        expected = view.serialize_queryset(queryset)
+        values_data = view.serialize_values(queryset)
+        self.assertEqual(values_data, expected)
+        self.assertEqual(json.dumps(values_data, cls=view.json_encoder),
+                         json.dumps(expected, cls=view.json_encoder))
+
+    def test_plain_fields(self):
+        self.assertSerializedEqual(SimpleModel)
+
+    def test_foreign_key(self):
+        self.assertSerializedEqual(DummyModel)
+
+    def test_many_to_many(self):
+        self.assertSerializedEqual(M2MModel)
+
+    def test_field_types(self):
+        self.assertSerializedEqual(SerializerModel)
+
+    def test_selected_fields(self):
+        self.assertSerializedEqual(DummyModel, fields=['name', 'model2'])
+        self.assertSerializedEqual(SerializerModel, fields=['price', 'dummy_models'])
+
+    def test_filtered_and_sliced_queryset(self):
+        self.assertSerializedEqual(DummyModel, queryset=DummyModel.objects.filter(name__startswith='J'))
+        self.assertSerializedEqual(DummyModel, queryset=DummyModel.objects.order_by('-name')[1:3])
+
+    def test_ng_query(self):
+        class SerializerModelView(NgCRUDView):
+            model = SerializerModel
+            use_values_serializer = True
+
+        response = SerializerModelView.as_view()(self.factory.get('/crud/'))
+        data = json.loads(response.content.decode('utf-8'))
+        self.assertEqual([obj['price'] for obj in data], ['19.50', '9.95'])
+        self.assertEqual(data[1]['dummy_models'], [DummyModel2.objects.get(name="Other name").pk])
@@ -1,11 +1,40 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import datetime
+import gzip
 import json
-from django.test import TestCase
+import uuid
+from decimal import Decimal
+from unittest import mock, skipUnless
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.test import TestCase, override_settings
 from django.test.client import RequestFactory
 from django.core.serializers.json import DjangoJSONEncoder
 from django.http import HttpResponse
+from django.utils import translation
+from django.utils.translation import gettext_lazy
 from django.views.generic import View
-from djng.views.mixins import JSONResponseMixin, allow_remote_invocation, allowed_action
+from djng.core.compression import get_accepted_encoding, get_content_encodings
+from djng.core.encoders import OrjsonBackend, StandardJSONBackend, get_json_backend
+from djng.views.batch import AsyncRMIBatchView, RMIBatchView
+from djng.views.mixins import (AsyncJSONResponseMixin, JSONResponseMixin, allow_remote_invocation, allowed_action,
+                               cache_remote_invocation)
+
+try:
+    from asgiref.sync import async_to_sync
+except ImportError:  # Django < 3.0
+    async_to_sync = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 
 class JSONResponseView(JSONResponseMixin, View):
@@ -28,6 +57,75 @@ class JSONResponseView(JSONResponseMixin, View):
         return {'success': True}
 
 
+class ETagResponseView(JSONResponseView):
+    use_etag = True
+
+
+class AsyncJSONResponseView(AsyncJSONResponseMixin, View):
+    @allow_remote_invocation
+    async def method_echo(self, in_data=None):
+        await asyncio.sleep(0)
+        return {'success': True, 'echo': in_data}
+
+    @allow_remote_invocation
+    def method_sync(self, in_data=None):
+        return {'success': True, 'sync': True}
+
+    def method_forbidden(self, in_data=None):
+        return {'success': True}
+
+
+class CachedResponseView(JSONResponseMixin, View):
+    invocations = []
+
+    @allow_remote_invocation
+    @cache_remote_invocation(timeout=60)
+    def lookup(self, in_data=None):
+        self.invocations.append(in_data)
+        return {'in_data': in_data, 'count': len(self.invocations)}
+
+    @allow_remote_invocation
+    @cache_remote_invocation()
+    async def lookup_async(self, in_data=None):
+        self.invocations.append(in_data)
+        return {'count': len(self.invocations)}
+
+    @allow_remote_invocation
+    @cache_remote_invocation(vary_on_user=False)
+    def lookup_shared(self, in_data=None):
+        self.invocations.append(in_data)
+        return {'q': self.request.GET.get('q'), 'count': len(self.invocations)}
+
+
+class AsyncCachedResponseView(AsyncJSONResponseMixin, CachedResponseView):
+    pass
+
+
+class LabeledResponseView(JSONResponseMixin, View):
+    label = None
+
+    @allow_remote_invocation
+    @cache_remote_invocation()
+    def lookup_label(self, in_data=None):
+        return {'label': self.label}
+
+
+class LabeledResponseViewA(LabeledResponseView):
+    label = 'A'
+
+
+class LabeledResponseViewB(LabeledResponseView):
+    label = 'B'
+
+
+class CompressedResponseView(JSONResponseView):
+    compress_min_length = 100
+
+    @allow_remote_invocation
+    def method_large(self, in_data=None):
+        return {'items': ['item {0}'.format(k) for k in range(100)]}
+
+
 class DummyView(View):
     def get(self, request, *args, **kwargs):
         return HttpResponse('GET OK')
@@ -132,6 +230,21 @@ class JSONResponseMixinTest(TestCase):
         out_data = json.loads(response.content.decode('utf-8'))
         self.assertTrue(out_data['success'])
 
+    def test_get_method_etag(self):
+        request = self.factory.get('/dummy.json',
+            HTTP_DJNG_REMOTE_METHOD='method_allowed',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        response = ETagResponseView().get(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(JSONResponseView().get(request).has_header('ETag'))
+
+        request = self.factory.get('/dummy.json',
+            HTTP_DJNG_REMOTE_METHOD='method_allowed',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        response = ETagResponseView().get(request)
+        self.assertEqual(response.status_code, 304)
+
     def test_post_pass_through(self):
         request = self.factory.post('/dummy.json', data=self.data)
         response = DummyResponseView().post(request)
@@ -145,3 +258,265 @@ class JSONResponseMixinTest(TestCase):
         self.assertIsInstance(response, HttpResponse)
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.content.decode('utf-8'), 'GET OK')
+
+    def test_remote_methods_table(self):
+        remote_methods = JSONResponseView.get_remote_methods()
+        self.assertIs(JSONResponseView.get_remote_methods(), remote_methods)
+        self.assertEqual(sorted(remote_methods.keys()), ['deprecated_action', 'method_allowed', 'method_echo'])
+        self.assertEqual(remote_methods['method_echo'][1], 'auto')
+        with self.assertRaises(TypeError):
+            remote_methods['method_forbidden'] = (None, 'auto')
+
+        class DerivedResponseView(JSONResponseView):
+            @allow_remote_invocation
+            def method_forbidden(self, in_data=None):
+                return {'success': False}
+
+        self.assertIn('method_forbidden', DerivedResponseView.get_remote_methods())
+        self.assertNotIn('method_forbidden', JSONResponseView.get_remote_methods())
+
+
+@skipUnless(async_to_sync, "asgiref is not installed")
+class AsyncJSONResponseMixinTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.view = AsyncJSONResponseView.as_view()
+
+    def test_as_view(self):
+        self.assertTrue(asyncio.iscoroutinefunction(self.view))
+        self.assertIs(self.view.view_class, AsyncJSONResponseView)
+
+    def test_post_async_method(self):
+        request = self.factory.post('/dummy.json',
+            data=json.dumps({'foo': 'bar'}),
+            content_type='application/json; charset=utf-8;',
+            HTTP_DJNG_REMOTE_METHOD='method_echo',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        response = async_to_sync(self.view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(json.loads(response.content.decode('utf-8')), {'success': True, 'echo': {'foo': 'bar'}})
+
+    def test_get_sync_method(self):
+        request = self.factory.get('/dummy.json',
+            HTTP_DJNG_REMOTE_METHOD='method_sync',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        response = async_to_sync(self.view)(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(json.loads(response.content.decode('utf-8')), {'success': True, 'sync': True})
+
+    def test_forbidden_and_pass_through(self):
+        request = self.factory.get('/dummy.json',
+            HTTP_DJNG_REMOTE_METHOD='method_forbidden',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        self.assertEqual(async_to_sync(self.view)(request).status_code, 403)
+        response = async_to_sync(self.view)(self.factory.get('/dummy.json'))
+        self.assertEqual(response.status_code, 405)
+        self.assertEqual(response.content.decode('utf-8'), 'This view can not handle method GET')
+
+
+class CacheRemoteInvocationTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        CachedResponseView.invocations = []
+        CachedResponseView.lookup.invalidate_cache()
+        CachedResponseView.lookup_async.invalidate_cache()
+        CachedResponseView.lookup_shared.invalidate_cache()
+
+    def invoke(self, view_class, remote_method, data=None, user=None, query=None):
+        if data is None:
+            request = self.factory.get('/dummy.json', query, HTTP_DJNG_REMOTE_METHOD=remote_method,
+                                       HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        else:
+            request = self.factory.post('/dummy.json', json.dumps(data), content_type='application/json',
+                                        HTTP_DJNG_REMOTE_METHOD=remote_method, HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        request.user = user or AnonymousUser()
+        view = view_class.as_view()
+        if asyncio.iscoroutinefunction(view):
+            view = async_to_sync(view)
+        return json.loads(view(request).content.decode('utf-8'))
+
+    def test_cached_result(self):
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup'), {'in_data': None, 'count': 1})
+        with mock.patch.object(StandardJSONBackend, 'dumps') as dumps:
+            self.assertEqual(self.invoke(CachedResponseView, 'lookup'), {'in_data': None, 'count': 1})
+        dumps.assert_not_called()
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup', {'q': 'a'}), {'in_data': {'q': 'a'}, 'count': 2})
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup', {'q': 'a'}), {'in_data': {'q': 'a'}, 'count': 2})
+        with translation.override('de'):
+            self.assertEqual(self.invoke(CachedResponseView, 'lookup'), {'in_data': None, 'count': 3})
+        self.assertEqual(len(CachedResponseView.invocations), 3)
+
+        CachedResponseView.lookup.invalidate_cache()
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup'), {'in_data': None, 'count': 4})
+
+    def test_vary_on_query_and_user(self):
+        john = User.objects.create_user('john')
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup', user=john), {'in_data': None, 'count': 1})
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup', user=john), {'in_data': None, 'count': 1})
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup'), {'in_data': None, 'count': 2})
+
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup_shared', query={'q': 'a'}), {'q': 'a', 'count': 3})
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup_shared', query={'q': 'a'}, user=john),
+                         {'q': 'a', 'count': 3})
+        self.assertEqual(self.invoke(CachedResponseView, 'lookup_shared', query={'q': 'b'}), {'q': 'b', 'count': 4})
+
+    def test_vary_on_view_class(self):
+        LabeledResponseView.lookup_label.invalidate_cache()
+        self.assertEqual(self.invoke(LabeledResponseViewA, 'lookup_label'), {'label': 'A'})
+        self.assertEqual(self.invoke(LabeledResponseViewB, 'lookup_label'), {'label': 'B'})
+        self.assertEqual(self.invoke(LabeledResponseViewA, 'lookup_label'), {'label': 'A'})
+
+    @skipUnless(async_to_sync, "asgiref is not installed")
+    def test_async_cached_result(self):
+        john = User.objects.create_user('john')
+        self.assertEqual(self.invoke(AsyncCachedResponseView, 'lookup_async', user=john), {'count': 1})
+        self.assertEqual(self.invoke(AsyncCachedResponseView, 'lookup_async', user=john), {'count': 1})
+        self.assertEqual(self.invoke(AsyncCachedResponseView, 'lookup_async'), {'count': 2})
+        self.assertEqual(self.invoke(AsyncCachedResponseView, 'lookup'), {'in_data': None, 'count': 3})
+        self.assertEqual(self.invoke(AsyncCachedResponseView, 'lookup'), {'in_data': None, 'count': 3})
+
+
+@override_settings(ROOT_URLCONF='server.tests.urls')
+class RMIBatchViewTest(TestCase):
+    invocations = [
+        {'url': '/sub_methods/sub/app/', 'method': 'foo', 'data': {'x': 1}},
+        {'url': '/url_resolvers/', 'method': 'blah', 'data': {}},
+        {'url': '/sub_methods/sub/app/', 'method': 'get'},
+        {'url': '/sub_methods/sub/app/', 'method': 'no_such_method'},
+        {'url': '/no_such_url/', 'method': 'foo'},
+    ]
+    expected = [
+        {'status': 200, 'data': {'foo': 'abc'}},
+        {'status': 200, 'data': {'blah': 'abc'}},
+        {'status': 403, 'data': {'message': "Method 'RemoteMethodsView.get' has no decorator '@allow_remote_invocation'"}},
+        {'status': 404, 'data': {'message': "No remote method 'no_such_method' found for '/sub_methods/sub/app/'"}},
+        {'status': 404, 'data': {'message': "No view found for '/no_such_url/'"}},
+    ]
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def post_batch(self, view, invocations):
+        request = self.factory.post('/rmi-batch/', json.dumps(invocations), content_type='application/json')
+        return view(request)
+
+    def test_batch(self):
+        response = self.post_batch(RMIBatchView.as_view(), self.invocations)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), self.expected)
+
+    @skipUnless(async_to_sync, "asgiref is not installed")
+    def test_async_batch(self):
+        view = AsyncRMIBatchView.as_view()
+        self.assertTrue(asyncio.iscoroutinefunction(view))
+        response = async_to_sync(view)(self.factory.post('/rmi-batch/', json.dumps(self.invocations),
+                                                         content_type='application/json'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), self.expected)
+
+    def test_invalid_batch(self):
+        response = self.post_batch(RMIBatchView.as_view(), {'url': '/url_resolvers/'})
+        self.assertEqual(response.status_code, 400)
+        response = self.post_batch(RMIBatchView.as_view(max_batch_size=2), self.invocations)
+        self.assertEqual(response.status_code, 413)
+
+
+class JSONBackendTest(TestCase):
+    data = {
+        'decimal': Decimal('1.10'),
+        'datetime': datetime.datetime(2020, 2, 29, 12, 30, 15, 123456),
+        'date': datetime.date(2020, 2, 29),
+        'time': datetime.time(12, 30),
+        'duration': datetime.timedelta(hours=1),
+        'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'lazy': gettext_lazy("Hello"),
+        'list': [1, 2.5, None, True, 'text'],
+    }
+
+    def test_default_backend(self):
+        backend = get_json_backend(None, DjangoJSONEncoder)
+        self.assertIsInstance(backend, StandardJSONBackend)
+        self.assertEqual(backend.dumps(self.data), json.dumps(self.data, cls=DjangoJSONEncoder))
+
+    @skipUnless(orjson, "orjson is not installed")
+    def test_orjson_backend(self):
+        backend = get_json_backend('djng.core.encoders.OrjsonBackend', DjangoJSONEncoder)
+        self.assertIsInstance(backend, OrjsonBackend)
+        self.assertEqual(json.loads(backend.dumps(self.data).decode('utf-8')),
+                         json.loads(json.dumps(self.data, cls=DjangoJSONEncoder)))
+        # orjson refuses integers exceeding 64 bit
+        self.assertEqual(backend.dumps({'huge': 2 ** 70}), '{"huge": 1180591620717411303424}')
+
+    @override_settings(DJNG_JSON_BACKEND='djng.core.encoders.OrjsonBackend')
+    def test_response_with_configured_backend(self):
+        backend = JSONResponseView().get_json_backend()
+        self.assertIsInstance(backend, OrjsonBackend if orjson else StandardJSONBackend)
+        request = RequestFactory().get('/dummy.json',
+            HTTP_DJNG_REMOTE_METHOD='method_allowed',
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest')
+        response = JSONResponseView().get(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'success': True})
+
+
+class CompressedResponseTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, remote_method, **extra):
+        request = self.factory.get('/dummy.json', HTTP_DJNG_REMOTE_METHOD=remote_method,
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest', **extra)
+        return CompressedResponseView.as_view()(request)
+
+    def test_accepted_encoding(self):
+        self.assertEqual(get_accepted_encoding('gzip, deflate'), 'gzip')
+        self.assertEqual(get_accepted_encoding('br;q=1.0, gzip;q=0.5'), 'br' if brotli else 'gzip')
+        self.assertIsNone(get_accepted_encoding('gzip;q=0, identity'))
+        self.assertEqual(get_accepted_encoding('*'), get_content_encodings()[0])
+        self.assertIsNone(get_accepted_encoding('gzip;q=0, br;q=0, *'))
+        self.assertEqual(get_accepted_encoding('br;q=0, *'), 'gzip')
+        self.assertIsNone(get_accepted_encoding(''))
+
+    def test_gzip_response(self):
+        response = self.get('method_large', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        data = json.loads(gzip.decompress(response.content).decode('utf-8'))
+        self.assertEqual(data['items'][99], 'item 99')
+
+    @skipUnless(brotli, "brotli is not installed")
+    def test_brotli_response(self):
+        response = self.get('method_large', HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        data = json.loads(brotli.decompress(response.content).decode('utf-8'))
+        self.assertEqual(data['items'][99], 'item 99')
+
+    def test_uncompressed_response(self):
+        response = self.get('method_large')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(len(json.loads(response.content.decode('utf-8'))['items']), 100)
+        response = self.get('method_allowed', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(response.content.decode('utf-8')), {'success': True})
+        request = self.factory.get('/dummy.json', HTTP_DJNG_REMOTE_METHOD='method_large',
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_ACCEPT_ENCODING='gzip')
+        response = JSONResponseView.as_view()(request)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_weak_etag(self):
+        request = self.factory.get('/dummy.json', HTTP_DJNG_REMOTE_METHOD='method_large',
+                                   HTTP_X_REQUESTED_WITH='XMLHttpRequest', HTTP_ACCEPT_ENCODING='gzip')
+        response = CompressedResponseView.as_view(use_etag=True)(request)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+
+    @override_settings(DJNG_JSON_COMPRESS_LEVEL=1)
+    def test_streaming_response(self):
+        view = CompressedResponseView()
+        view.setup(self.factory.get('/dummy.json', HTTP_ACCEPT_ENCODING='gzip'))
+        response = view.json_streaming_response([[1, 2], [], [3]])
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        content = gzip.decompress(b''.join(response.streaming_content))
+        self.assertEqual(json.loads(content.decode('utf-8')), [1, 2, 3])
@@ -75,10 +75,16 @@ def locale_script_view(request):
     return HttpResponse(template.render(request_context))
 
 
+def article_view(request, **kwargs):
+    return HttpResponse('article')
+
+
 urlpatterns = [
     url(r'^sub_methods/', include(sub_patterns, namespace='submethods')),
     url(r'^straight_methods/$', TestCSRFValueView.as_view(), name='straightmethods'),
     url(r'^url_resolvers/$', TestUrlResolverTagsView.as_view(), name='urlresolvertags'),
     url(r'^angular_tag/$', TestAngularTagView.as_view(), name='angulartags'),
     url(r'^locale_script_tag/$', locale_script_view, name='locale_script'),
+    url(r'^articles/(?P<pk>\d+)/$', article_view, name='article'),
+    url(r'^articles/(?P<year>\d{4})/(?P<slug>[\w-]+)/$', article_view, name='article'),
 ]
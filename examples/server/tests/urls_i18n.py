@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+from django.conf.urls import url, include
+from django.conf.urls.i18n import i18n_patterns
+
+from .urls import TestUrlResolverTagsView, sub_patterns
+
+
+urlpatterns = i18n_patterns(
+    url(r'^sub_methods/', include(sub_patterns, namespace='submethods')),
+    url(r'^url_resolvers/$', TestUrlResolverTagsView.as_view(), name='urlresolvertags'),
+)